@@ -0,0 +1,263 @@
+# Python Set Game
+# Images decoded once per process and shared by every Game, so starting a new game
+# does not read the card faces from disk again
+# Once the display exists every image is kept in its pixel format, so blitting
+# one does not convert it pixel by pixel on every frame
+
+import queue
+import threading
+
+import pygame
+import planes.gui
+
+from atlas import Atlas, atlas_exists
+from card_utils import CARDS
+
+IMAGE_DIR = "img/"
+
+
+def surface_bytes(surface):
+    """
+    Returns: the number of bytes the pixels of surface take up
+    """
+    return surface.get_pitch() * surface.get_height()
+
+
+def _convert_image(key, image):
+    return to_display_format(image)
+
+
+def display_ready():
+    return pygame.display.get_surface() is not None
+
+
+def to_display_format(surface):
+    """
+    Returns: a copy of surface in the pixel format of the display, keeping per-pixel
+             alpha if it has any, or surface itself if there is no display yet
+    """
+    if not display_ready():
+        return surface
+    if surface.get_flags() & pygame.SRCALPHA:
+        return surface.convert_alpha()
+    return surface.convert()
+
+
+class ImageCache:
+    """
+    An ImageCache decodes each image the first time it is asked for, then hands out
+    the same Surface every time after that
+    The Surfaces are shared by everything that asks for them, so never draw on one
+    load is a function from a key to a freshly loaded Surface
+    Images are converted to the display format as they are loaded; those loaded
+    before the display exists are converted by convert_all()
+    convert, if given, is a function of a key and its image doing that conversion
+    prefetch() decodes images in a background thread ahead of time; get() counts
+    those as prefetched rather than as hits or misses
+    """
+    def __init__(self, name, load, convert=_convert_image):
+        self.name = name
+        self.load = load
+        self.convert = convert
+        self.images = {}
+        self.unconverted = set()  # keys of images loaded before the display existed
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+
+        # decoded by the prefetch thread, waiting for get() to convert them
+        self.decoded = {}
+        self.decoding = None  # key the prefetch thread is decoding right now
+        self.loading = set()  # keys get() is loading, which the prefetch thread skips
+        self.lock = threading.Condition()
+        self.requests = None
+        self.thread = None
+
+    def get(self, key):
+        image = self.images.get(key)
+        if image is not None:
+            self.hits += 1
+            return image
+        with self.lock:
+            # rather than decode it a second time, wait for the prefetch thread to finish it
+            while key == self.decoding:
+                self.lock.wait()
+            image = self.decoded.pop(key, None)
+            self.loading.add(key)
+        try:
+            if image is None:
+                self.misses += 1
+                image = self.load(key)
+            else:
+                self.prefetched += 1
+            if display_ready():
+                image = self.convert(key, image)
+            else:
+                self.unconverted.add(key)
+            self.images[key] = image
+        finally:
+            with self.lock:
+                self.loading.discard(key)
+        return image
+
+    def prefetch(self, keys):
+        """
+        Starts decoding the images of keys in a background thread, so that get() finds
+        them ready; converting them to the display format is still left to get()
+        """
+        for key in keys:
+            if key not in self.images:
+                if self.thread is None:
+                    self.requests = queue.Queue()
+                    self.thread = threading.Thread(target=self._decode_requests)
+                    self.thread.daemon = True
+                    self.thread.start()
+                self.requests.put(key)
+
+    def _decode_requests(self):
+        while True:
+            key = self.requests.get()
+            with self.lock:
+                if key in self.images or key in self.decoded or key in self.loading:
+                    continue
+                self.decoding = key
+            try:
+                image = self.load(key)
+            except Exception:
+                image = None  # get() loads it again and raises the error itself
+            with self.lock:
+                if image is not None:
+                    self.decoded[key] = image
+                self.decoding = None
+                self.lock.notify_all()
+
+    def __contains__(self, key):
+        return key in self.images
+
+    def __len__(self):
+        return len(self.images)
+
+    def memory(self):
+        """
+        Returns: the number of bytes of pixels held by the cache
+        Images cut from the same atlas share its pixels, which are counted once
+        """
+        bases = {}
+        for image in self.images.values():
+            base = image.get_abs_parent()
+            bases[id(base)] = base
+        return sum(surface_bytes(base) for base in bases.values())
+
+    def evict(self, key=None):
+        """
+        Forgets one image, or every image if key is None, so it is loaded again next time
+        Surfaces already handed out stay valid
+        Returns: the number of images forgotten
+        """
+        if key is None:
+            evicted = len(self.images)
+            self.images.clear()
+            self.unconverted.clear()
+            with self.lock:
+                self.decoded.clear()
+            return evicted
+        self.unconverted.discard(key)
+        with self.lock:
+            self.decoded.pop(key, None)
+        if self.images.pop(key, None) is None:
+            return 0
+        return 1
+
+    def convert_all(self):
+        """
+        Converts the images loaded before the display existed to the display format
+        Only images handed out from now on are the converted ones
+        """
+        if not display_ready():
+            return
+        for key in self.unconverted:
+            self.images[key] = self.convert(key, self.images[key])
+        self.unconverted.clear()
+
+    def report(self):
+        return (self.name + ": " + str(len(self)) + " cached, " + str(self.hits) + " hits, " +
+                str(self.misses) + " misses, " + str(self.prefetched) + " prefetched, " +
+                "%.1f" % (self.memory() / 1024.0 / 1024.0) + " MB")
+
+
+# path -> image, for everything that is not a card face
+IMAGES = ImageCache("images", pygame.image.load)
+
+
+def image(path):
+    """
+    Returns: the shared Surface of the image file at path
+    """
+    return IMAGES.get(path)
+
+
+# the Atlas the card faces are cut from, False if it has not been built,
+# None until the first face is loaded
+_card_atlas = None
+_card_atlas_lock = threading.Lock()
+
+
+def card_atlas():
+    global _card_atlas
+    with _card_atlas_lock:
+        if _card_atlas is None:
+            _card_atlas = Atlas() if atlas_exists() else False
+    return _card_atlas
+
+
+def load_card_face(card_id):
+    """
+    Returns: the face of card_id, cut from the atlas if it has been built with
+             atlas.py, loaded from its own image otherwise
+    """
+    atlas = card_atlas()
+    if atlas:
+        return atlas.face(card_id)
+    return pygame.image.load(IMAGE_DIR + CARDS[card_id].name + ".png")
+
+
+def convert_card_face(card_id, face):
+    """
+    Returns: the face of card_id in the display format
+    Faces from the atlas are cut again from the converted atlas, so they still share its pixels
+    """
+    atlas = card_atlas()
+    if atlas:
+        if not atlas.converted:
+            atlas.convert(to_display_format)
+        return atlas.face(card_id)
+    return to_display_format(face)
+
+
+# card_id -> face of the card
+CARD_FACES = ImageCache("card faces", load_card_face, convert_card_face)
+
+
+def card_face(card):
+    """
+    Returns: the shared Surface showing card
+    """
+    return CARD_FACES.get(card.card_id)
+
+
+def prefetch_card_faces(cards):
+    """
+    Starts decoding the faces of cards in the background
+    """
+    CARD_FACES.prefetch(card.card_id for card in cards)
+
+
+def convert_assets():
+    """
+    Call as soon as the planes.Display is made: converts every image loaded so far,
+    including the planes.gui styles, to the display format
+    Images loaded after this are converted as they are loaded
+    """
+    CARD_FACES.convert_all()
+    IMAGES.convert_all()
+    planes.gui.convert_styles()
@@ -0,0 +1,115 @@
+# Python Set Game
+# Packs the 81 card faces into one atlas image, and loads them back out of it
+#
+# Usage: python atlas.py        (run again whenever a card face in img/ changes)
+#
+# The atlas is a grid of faces, COLUMNS wide, in card_id order. It is saved as an
+# uncompressed BMP: that takes a few MB on disk but loads about ten times faster than
+# decoding the separate PNGs, where a compressed atlas would be no faster. Its index is a
+# small binary file: the MAGIC bytes, the number of faces as a uint16, then for each
+# card id the x, y, width and height of its face as uint16s, little-endian.
+# The game falls back to the separate card images when there is no atlas.
+
+import os
+import struct
+
+import pygame
+
+from card_utils import CARDS, NUM_CARDS
+
+ATLAS_IMAGE = "img/cards_atlas.bmp"
+ATLAS_INDEX = "img/cards_atlas.idx"
+
+MAGIC = b"SETATLS1"
+COLUMNS = 9
+
+COUNT = struct.Struct("<H")
+RECT = struct.Struct("<4H")
+
+
+def build_atlas(image_dir="img/", image_path=ATLAS_IMAGE, index_path=ATLAS_INDEX):
+    """
+    Packs the separate card images in image_dir into an atlas image and its index
+    Returns: list of the pygame.Rect of each face in the atlas, by card_id
+    """
+    faces = [pygame.image.load(os.path.join(image_dir, card.name + ".png")) for card in CARDS]
+    cell_width = max(face.get_width() for face in faces)
+    cell_height = max(face.get_height() for face in faces)
+    rows = (len(faces) + COLUMNS - 1) // COLUMNS
+
+    sheet = pygame.Surface((COLUMNS * cell_width, rows * cell_height), pygame.SRCALPHA, 32)
+    rects = []
+    for card_id, face in enumerate(faces):
+        rect = face.get_rect(topleft=((card_id % COLUMNS) * cell_width,
+                                      (card_id // COLUMNS) * cell_height))
+        sheet.blit(face, rect)
+        rects.append(rect)
+
+    pygame.image.save(sheet, image_path)
+    index = bytearray(MAGIC)
+    index += COUNT.pack(len(rects))
+    for rect in rects:
+        index += RECT.pack(rect.x, rect.y, rect.width, rect.height)
+    with open(index_path, "wb") as index_file:
+        index_file.write(index)
+    return rects
+
+
+def read_index(index_path=ATLAS_INDEX):
+    """
+    Returns: list of the pygame.Rect of each face in the atlas, by card_id
+    """
+    with open(index_path, "rb") as index_file:
+        data = index_file.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(index_path + " is not a card atlas index")
+    pos = len(MAGIC)
+    count = COUNT.unpack_from(data, pos)[0]
+    pos += COUNT.size
+    if count != NUM_CARDS or len(data) != pos + count * RECT.size:
+        raise ValueError(index_path + " does not index " + str(NUM_CARDS) + " card faces")
+    return [pygame.Rect(RECT.unpack_from(data, pos + i * RECT.size)) for i in range(count)]
+
+
+def atlas_exists(image_path=ATLAS_IMAGE, index_path=ATLAS_INDEX):
+    return os.path.exists(image_path) and os.path.exists(index_path)
+
+
+class Atlas:
+    """
+    An Atlas decodes the atlas image once and hands out each card face as a
+    subsurface of it, so the faces share the atlas' pixels instead of being copies
+    """
+    def __init__(self, image_path=ATLAS_IMAGE, index_path=ATLAS_INDEX):
+        self.rects = read_index(index_path)
+        self.sheet = pygame.image.load(image_path)
+        self.faces = {}
+        self.converted = False
+
+    def face(self, card_id):
+        """
+        Returns: the face of card_id, a subsurface of the atlas
+        """
+        face = self.faces.get(card_id)
+        if face is None:
+            face = self.sheet.subsurface(self.rects[card_id])
+            self.faces[card_id] = face
+        return face
+
+    def convert(self, convert):
+        """
+        Replaces the atlas with convert(atlas), so faces cut from now on come from it
+        Args: convert - function from a Surface to a copy of it in another pixel format
+        """
+        self.sheet = convert(self.sheet)
+        self.faces = {}
+        self.converted = True
+
+
+def main():
+    pygame.init()
+    rects = build_atlas()
+    print("packed " + str(len(rects)) + " card faces into " + ATLAS_IMAGE + " and " + ATLAS_INDEX)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# Python Set Game
+# Checking many triples of cards at once with numpy
+
+import numpy as np
+
+from card_utils import ENGINE
+
+# place value of each attribute digit in a card id: color, shape, number, shade
+DIGIT_PLACES = np.array(ENGINE.places)
+
+
+def card_digits(card_ids):
+    """
+    Splits card ids into their attribute digits
+    Args: card_ids - integer array of any shape, values in 0..80
+    Returns: integer array with an extra last axis of length 4, values in 0..2
+    """
+    return (np.asarray(card_ids)[..., np.newaxis] // DIGIT_PLACES) % 3
+
+
+def check_sets(triples):
+    """
+    Given many triples of cards, checks which of them form a Set
+    Three attribute digits are all the same or all different exactly when their
+    sum is divisible by 3, so a triple is a Set when that holds for all four digits
+    Gives the same result as check_set in card_utils.py for every triple
+    Args: triples - array of shape (N, 3) of card ids, or of shape (N, 3, 4) of
+          attribute indices (positions in COLORS, SHAPES, NUMBERS, SHADES)
+    Returns: boolean array of shape (N,), True where the triple is a Set
+    """
+    triples = np.asarray(triples)
+    if triples.ndim == 2 and triples.shape[1] == 3:
+        digits = card_digits(triples)
+    elif triples.ndim == 3 and triples.shape[1:] == (3, 4):
+        digits = triples
+    else:
+        raise ValueError("expected an (N, 3) array of card ids or an (N, 3, 4) "
+                         "array of attributes, got shape " + str(triples.shape))
+    return (digits.sum(axis=1) % 3 == 0).all(axis=1)
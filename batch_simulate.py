@@ -0,0 +1,165 @@
+# Python Set Game
+# Lockstep simulation of many games at once, held in numpy arrays
+#
+# Usage: python batch_simulate.py GAMES [--seed SEED] [--batch N]
+
+import argparse
+
+import numpy as np
+
+from card_utils import NUM_CARDS, THIRD_CARD
+from deck import spawn_rngs
+from game_core import BOARD_SIZE
+from simulate import Histograms
+
+# a board of 21 cards always holds a Set, so a game never needs more slots than this
+MAX_BOARD = 21
+
+# marks an empty board slot; THIRD[EMPTY] is EMPTY and EMPTY is never on the board,
+# so pairs with an empty slot never complete to a Set
+EMPTY = NUM_CARDS
+
+THIRD = np.full((NUM_CARDS + 1, NUM_CARDS + 1), EMPTY, dtype=np.int16)
+THIRD[:NUM_CARDS, :NUM_CARDS] = THIRD_CARD
+
+# every pair of board slots, as two index arrays
+PAIR_I, PAIR_J = np.triu_indices(MAX_BOARD, k=1)
+
+
+class BatchSimulation:
+    """
+    A BatchSimulation plays num_games games side by side, one turn of every game per step
+    Each game is a row of the arrays:
+    perms - the deck order, a permutation of the card ids
+    next_card - how many cards of perms have been dealt
+    board - card ids in each board slot, EMPTY where there is no card
+    on_board - the dealt mask, True for the cards on the board
+    Every turn, each game plays the Set from its first completing pair of slots, or deals
+    three cards if there is none, like simulate.first_set_player does with a GameCore
+    """
+    def __init__(self, num_games, seed=None):
+        rng = np.random.default_rng(seed)
+        cards = np.tile(np.arange(NUM_CARDS, dtype=np.int16), (num_games, 1))
+        self.perms = rng.permuted(cards, axis=1)
+        self.next_card = np.zeros(num_games, dtype=np.int64)
+        self.board = np.full((num_games, MAX_BOARD), EMPTY, dtype=np.int16)
+        self.on_board = np.zeros((num_games, NUM_CARDS + 1), dtype=bool)
+        self.done = np.zeros(num_games, dtype=bool)
+        self.plus3 = np.zeros(num_games, dtype=np.int64)
+        self.leftover = np.zeros(num_games, dtype=np.int64)
+        self.histograms = Histograms()
+        self._rows = np.arange(num_games)
+
+        self.deal(np.full(num_games, BOARD_SIZE, dtype=np.int64))
+
+    def deal(self, counts):
+        """
+        Deals counts[g] cards into the first empty slots of game g, while its deck lasts
+        """
+        counts = counts.copy()
+        while True:
+            rows = np.nonzero((counts > 0) & (self.next_card < NUM_CARDS))[0]
+            if len(rows) == 0:
+                return
+            slots = np.argmax(self.board[rows] == EMPTY, axis=1)
+            cards = self.perms[rows, self.next_card[rows]]
+            self.board[rows, slots] = cards
+            self.on_board[rows, cards] = True
+            self.next_card[rows] += 1
+            counts[rows] -= 1
+
+    def find_sets(self):
+        """
+        Completes every pair of slots in every game at once
+        Returns: (complete, first, cards) where complete[g, p] says whether pair p
+                 completes to a Set on board g, first[g] is the first such pair, and
+                 cards is a (3, num_games) array of the cards of that Set
+        """
+        card1 = self.board[:, PAIR_I]
+        card2 = self.board[:, PAIR_J]
+        third = THIRD[card1, card2]
+        complete = self.on_board[self._rows[:, np.newaxis], third]
+        first = np.argmax(complete, axis=1)
+        cards = np.array([card1[self._rows, first],
+                          card2[self._rows, first],
+                          third[self._rows, first]])
+        return complete, first, cards
+
+    def step(self):
+        """
+        Plays one turn of every game that is not over yet
+        """
+        complete, first, cards = self.find_sets()
+        has_set = complete.any(axis=1)
+        num_sets = complete.sum(axis=1) // 3
+        sizes = (self.board != EMPTY).sum(axis=1)
+
+        at_12 = ~self.done & (sizes == BOARD_SIZE)
+        self.histograms.boards_at_12 += int(at_12.sum())
+        self.histograms.no_set_at_12 += int((at_12 & ~has_set).sum())
+        for count, boards in enumerate(np.bincount(num_sets[at_12])):
+            if boards:
+                self.histograms.set_counts[count] += int(boards)
+
+        # take found Sets off the board, then refill up to 12 cards
+        found = np.nonzero(~self.done & has_set)[0]
+        for card in cards[:, found]:
+            slots = np.argmax(self.board[found] == card[:, np.newaxis], axis=1)
+            self.board[found, slots] = EMPTY
+            self.on_board[found, card] = False
+        counts = np.zeros(len(self.done), dtype=np.int64)
+        counts[found] = np.clip(BOARD_SIZE - (sizes[found] - 3), 0, 3)
+
+        # no Set: deal three more, or end the game when the deck is empty
+        stuck = ~self.done & ~has_set
+        deck_left = self.next_card < NUM_CARDS
+        counts[stuck & deck_left] = 3
+        self.plus3[stuck & deck_left] += 1
+        over = stuck & ~deck_left
+        self.leftover[over] = sizes[over]
+        self.done |= over
+
+        self.deal(counts)
+
+    def run(self):
+        """
+        Plays every game to the end
+        Returns: Histograms of the games
+        """
+        while not self.done.all():
+            self.step()
+        self.histograms.games = len(self.done)
+        for count, games in enumerate(np.bincount(self.plus3)):
+            if games:
+                self.histograms.plus3[count] += int(games)
+        for count, games in enumerate(np.bincount(self.leftover)):
+            if games:
+                self.histograms.leftover[count] += int(games)
+        return self.histograms
+
+
+def batch_simulate(num_games, seed=None, batch_size=10000):
+    """
+    Plays num_games games in batches of batch_size, each with its own generator from
+    deck.spawn_rngs(seed)
+    Returns: Histograms of all the games
+    """
+    batches = [batch_size] * (num_games // batch_size)
+    if num_games % batch_size:
+        batches.append(num_games % batch_size)
+    total = Histograms()
+    for rng, games in zip(spawn_rngs(seed, len(batches)), batches):
+        total.merge(BatchSimulation(games, rng).run())
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many games of Set in lockstep")
+    parser.add_argument("games", type=int, help="number of games to play")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--batch", type=int, default=10000, help="games held in memory at once")
+    args = parser.parse_args()
+    print(batch_simulate(args.games, args.seed, args.batch).report())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# Python Set Game
+# Bitboard representation of the game: one bit per card, 81 bits per pile
+
+from card_utils import ENGINE, NUM_CARDS
+
+FULL_DECK = (1 << NUM_CARDS) - 1
+
+
+def popcount(bits):
+    """
+    Returns the number of cards in a bitboard
+    """
+    return bin(bits).count("1")
+
+
+def card_ids(bits):
+    """
+    Yields the ids of the cards in a bitboard, lowest id first
+    """
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def _build_set_masks():
+    """
+    Builds the masks of all 1080 Sets of the full deck, grouped by the lowest card id in the Set
+    Returns: list indexed by card id, of lists of 3-bit masks
+    """
+    masks = [[] for _ in range(NUM_CARDS)]
+    for id1, id2, id3 in ENGINE.all_sets():
+        masks[id1].append((1 << id1) | (1 << id2) | (1 << id3))
+    return masks
+
+
+# SETS_FROM[card_id] are the masks of the Sets whose lowest card is card_id
+SETS_FROM = _build_set_masks()
+
+# SET_MASKS are all 1080 Sets of the full deck
+SET_MASKS = [mask for masks in SETS_FROM for mask in masks]
+
+
+class BitBoard:
+    """
+    A BitBoard tracks the board, the rest of the deck and the discard pile as
+    81-bit integers, with bit card_id set for every card in that pile
+    Membership tests are a single AND, and a Set is on the board exactly when one
+    of the precomputed Set masks is contained in the board bits
+    It provides the same interface as Board so it can stand in for it in Game,
+    and also works on its own with bare card ids
+    """
+    def __init__(self):
+        self.board = 0
+        self.deck = FULL_DECK
+        self.discard = 0
+        self.cards = []
+        self.by_id = {}
+        self.positions = {}  # card_id -> index in cards
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __contains__(self, card):
+        return self.board >> card.card_id & 1 == 1
+
+    # Puts card at position index, taking it out of the deck
+    def insert(self, index, card):
+        self.cards.insert(index, card)
+        self.by_id[card.card_id] = card
+        for i in range(index, len(self.cards)):
+            self.positions[self.cards[i].card_id] = i
+        self.deal_id(card.card_id)
+
+    # Moves card from the board to the discard pile
+    # Returns the position the card was at
+    def remove(self, card):
+        self.discard_id(card.card_id)
+        del self.by_id[card.card_id]
+        index = self.positions.pop(card.card_id)
+        del self.cards[index]
+        for i in range(index, len(self.cards)):
+            self.positions[self.cards[i].card_id] = i
+        return index
+
+    # Returns the position of card on the board
+    def position(self, card):
+        return self.positions[card.card_id]
+
+    def deal_id(self, card_id):
+        bit = 1 << card_id
+        self.deck &= ~bit
+        self.board |= bit
+
+    def discard_id(self, card_id):
+        bit = 1 << card_id
+        self.board &= ~bit
+        self.discard |= bit
+
+    # Checks if card has left the deck, either to the board or to the discard pile
+    def is_dealt(self, card):
+        return self.deck >> card.card_id & 1 == 0
+
+    def deck_size(self):
+        return popcount(self.deck)
+
+    def _board_set_masks(self):
+        """
+        Yields the mask of every Set on the board
+        Only the Sets starting at a card on the board can be on it, so those are the only ones tested
+        """
+        board = self.board
+        for card_id in card_ids(board):
+            for mask in SETS_FROM[card_id]:
+                if mask & board == mask:
+                    yield mask
+
+    def has_set(self):
+        for _ in self._board_set_masks():
+            return True
+        return False
+
+    def count_sets(self):
+        return sum(1 for _ in self._board_set_masks())
+
+    def find_set_ids(self):
+        """
+        Returns: the ids of one Set on the board as a tuple, lowest first, or None if there is none
+        """
+        for mask in self._board_set_masks():
+            return tuple(card_ids(mask))
+        return None
+
+    def iter_sets(self):
+        """
+        Yields every Set on the board once, as a tuple of three cards
+        """
+        for mask in self._board_set_masks():
+            yield tuple(self.by_id[card_id] for card_id in card_ids(mask))
+
+    def find_set(self):
+        """
+        Returns: one Set on the board as a tuple of three cards, or None if there is none
+        """
+        for found in self.iter_sets():
+            return found
+        return None
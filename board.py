@@ -0,0 +1,84 @@
+# Python Set Game
+# The cards in play, with a live index of the Sets among them
+
+from card_utils import THIRD_CARD
+
+
+class Board:
+    """
+    A Board holds the cards in play, in display order
+    It keeps an index of every Set present on the board, updated in O(n) whenever
+    a card is inserted or removed, so asking whether there is a Set, how many there
+    are, or for one of them never re-scans the board
+    """
+    def __init__(self, cards=()):
+        self.cards = []
+        self.by_id = {}
+        self.positions = {}  # card_id -> index in cards
+        self.sets = set()  # each Set is a tuple of three card ids, sorted
+        for card in cards:
+            self.insert(len(self.cards), card)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __contains__(self, card):
+        return card.card_id in self.by_id
+
+    def _sets_with(self, card_id):
+        """
+        Yields every Set on the board that contains the given card id
+        Each Set is yielded once per other card in it, so twice in total
+        """
+        completions = THIRD_CARD[card_id]
+        for other_id in self.by_id:
+            third_id = completions[other_id]
+            if third_id in self.by_id and other_id != card_id:
+                yield tuple(sorted((card_id, other_id, third_id)))
+
+    # Puts card at position index, adding any new Sets to the index
+    def insert(self, index, card):
+        self.cards.insert(index, card)
+        self.by_id[card.card_id] = card
+        for i in range(index, len(self.cards)):
+            self.positions[self.cards[i].card_id] = i
+        self.sets.update(self._sets_with(card.card_id))
+
+    # Takes card off the board, removing its Sets from the index
+    # Returns the position the card was at
+    def remove(self, card):
+        self.sets.difference_update(self._sets_with(card.card_id))
+        del self.by_id[card.card_id]
+        index = self.positions.pop(card.card_id)
+        del self.cards[index]
+        for i in range(index, len(self.cards)):
+            self.positions[self.cards[i].card_id] = i
+        return index
+
+    # Returns the position of card on the board
+    def position(self, card):
+        return self.positions[card.card_id]
+
+    def has_set(self):
+        return len(self.sets) > 0
+
+    def count_sets(self):
+        return len(self.sets)
+
+    def iter_sets(self):
+        """
+        Yields every Set on the board once, as a tuple of three cards
+        """
+        for ids in list(self.sets):
+            yield tuple(self.by_id[card_id] for card_id in ids)
+
+    def find_set(self):
+        """
+        Returns: one Set on the board as a tuple of three cards, or None if there is none
+        """
+        for ids in self.sets:
+            return tuple(self.by_id[card_id] for card_id in ids)
+        return None
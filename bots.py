@@ -0,0 +1,168 @@
+# Python Set Game
+# Automated players, and a benchmark of the rules engine driven by them
+#
+# Usage: python bots.py [--games N] [--bot first|random|greedy|perfect] [--seed SEED] [--bitboard]
+#
+# A bot is any function taking a GameCore and returning a Set on its board as a tuple
+# of three cards, or None when it wants three more cards; simulate.py takes the same players.
+
+import argparse
+import time
+
+from deck import make_rng
+from endgame import Lookahead
+from game_core import GameCore
+
+
+def first_found_bot(core):
+    """
+    Plays the first Set the board's index hands out
+    """
+    return core.find_set()
+
+
+class RandomSetBot:
+    """
+    Plays a Set chosen at random among all the Sets on the board
+    """
+    def __init__(self, seed=None):
+        self.rng = make_rng(seed)
+
+    def __call__(self, core):
+        sets = sorted(core.find_all_sets(), key=lambda found: sorted(card.card_id for card in found))
+        if not sets:
+            return None
+        return sets[int(self.rng.random() * len(sets))]
+
+
+def greedy_bot(core):
+    """
+    Plays the Set that leaves the most Sets on the board, so the board stays rich in Sets
+    Taking a Set away also breaks every other Set sharing a card with it, so the bot
+    picks the Set that overlaps the fewest others
+    """
+    sets = list(core.find_all_sets())
+    best = None
+    best_overlap = None
+    for found in sets:
+        overlap = sum(1 for other in sets if other is not found and
+                      (other[0] in found or other[1] in found or other[2] in found))
+        if best is None or overlap < best_overlap:
+            best = found
+            best_overlap = overlap
+    return best
+
+
+class PerfectBot:
+    """
+    Plays the Set that leaves the fewest cards at the end of the game, knowing the deck order
+    Only meant for measuring how well the other bots do: it reads the shuffled deck
+    """
+    def __init__(self, seed=None):
+        self.lookahead = None
+
+    def __call__(self, core):
+        if self.lookahead is None or self.lookahead.core is not core:
+            self.lookahead = Lookahead(core)
+        return self.lookahead.best_set()
+
+
+# bot name -> function of a seed returning the bot
+BOTS = {"first": lambda seed: first_found_bot,
+        "random": RandomSetBot,
+        "greedy": lambda seed: greedy_bot,
+        "perfect": PerfectBot}
+
+
+def play_game(core, bot):
+    """
+    Lets bot play core until the game is over, asking for three more cards whenever it
+    finds no Set; stops if the bot finds no Set when there is one
+    Returns: the number of turns played
+    """
+    turns = 0
+    while True:
+        turns += 1
+        found = bot(core)
+        if found is not None:
+            core.submit(list(found))
+        elif len(core.deck) == 0 or not core.add_three():
+            return turns
+
+
+class Timer:
+    """
+    Collects how long each call of one operation took
+    """
+    def __init__(self, name):
+        self.name = name
+        self.times = []
+
+    def wrap(self, function):
+        def timed(*args):
+            start = time.perf_counter()
+            result = function(*args)
+            self.times.append(time.perf_counter() - start)
+            return result
+        return timed
+
+    def report(self):
+        if not self.times:
+            return self.name + ": no calls"
+        ordered = sorted(self.times)
+        mean = sum(ordered) / len(ordered)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        return (self.name + ": " + str(len(ordered)) + " calls, mean " + "%.2f" % (mean * 1e6) +
+                " us, p99 " + "%.2f" % (p99 * 1e6) + " us")
+
+
+def benchmark(num_games, bot_name="first", seed=0, bitboard=False):
+    """
+    Plays num_games games with one bot, timing the operations of the rules engine
+    Each game is played twice: once untimed for games per second, and once with
+    check_if_any_sets, hint generation and dealing wrapped in timers
+    Returns: tuple (games per second, list of Timers)
+    """
+    rng = make_rng(seed)
+    seeds = [int(rng.random() * 2**62) for _ in range(num_games)]
+
+    start = time.perf_counter()
+    for game_seed in seeds:
+        play_game(GameCore(game_seed, auto_add3=False, bitboard=bitboard), BOTS[bot_name](game_seed))
+    games_per_second = num_games / (time.perf_counter() - start)
+
+    any_sets = Timer("check_if_any_sets")
+    hints = Timer("find_hint_set")
+    deals = Timer("deal")
+    for game_seed in seeds:
+        core = GameCore(game_seed, auto_add3=False, bitboard=bitboard)
+        core.deal = deals.wrap(core.deal)
+        check_if_any_sets = any_sets.wrap(core.check_if_any_sets)
+        find_hint_set = hints.wrap(core.find_hint_set)
+        bot = BOTS[bot_name](game_seed)
+
+        def timed_bot(core):
+            check_if_any_sets()
+            if core.in_play_cards:
+                find_hint_set(core.in_play_cards[:1])
+            return bot(core)
+        play_game(core, timed_bot)
+    return games_per_second, [any_sets, hints, deals]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Set rules engine with bot players")
+    parser.add_argument("--games", type=int, default=500)
+    parser.add_argument("--bot", choices=sorted(BOTS), default=None, help="default: every bot")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bitboard", action="store_true", help="use the BitBoard engine")
+    args = parser.parse_args()
+
+    for bot_name in ([args.bot] if args.bot else sorted(BOTS)):
+        games_per_second, timers = benchmark(args.games, bot_name, args.seed, args.bitboard)
+        print(bot_name + ": " + "%.1f" % games_per_second + " games/s")
+        for timer in timers:
+            print("  " + timer.report())
+
+if __name__ == "__main__":
+    main()
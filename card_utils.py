@@ -0,0 +1,107 @@
+# Python Set Game
+# Card model and encoding helpers, usable without pygame
+
+from set_engine import CHUNK_TABLE, SetEngine
+
+COLORS = ['green', 'red', 'purple']
+SHAPES = ['oval', 'diamond', 'squiggle']
+NUMBERS = [1, 2, 3]
+SHADES = ['filled', 'shaded', 'empty']
+
+NUM_CARDS = 81
+
+
+def card_id(color, shape, number, shade):
+    """
+    Encodes the attributes of a card as a single integer
+    Each attribute is one base-3 digit, most significant first: color, shape, number, shade
+    Args: color, shape, number, shade - attribute values from COLORS, SHAPES, NUMBERS, SHADES
+    Returns: the card id, an integer in 0..80
+    """
+    return ENGINE.encode((COLORS.index(color), SHAPES.index(shape),
+                          NUMBERS.index(number), SHADES.index(shade)))
+
+
+def card_attributes(card_id):
+    """
+    Decodes a card id back into its attribute values
+    Args: card_id - an integer in 0..80
+    Returns: tuple (color, shape, number, shade)
+    """
+    color, shape, number, shade = ENGINE.decode(card_id)
+    return COLORS[color], SHAPES[shape], NUMBERS[number], SHADES[shade]
+
+
+def card_name(card_id):
+    """
+    Returns the name of a card, which is also the name of its image in img/
+    For example: "greenovalfilled1"
+    """
+    color, shape, number, shade = card_attributes(card_id)
+    return color + shape + shade + str(number)
+
+
+# the classic deck is the 4-attribute case of the general engine
+ENGINE = SetEngine(4)
+
+# THIRD_CARD[id1][id2] is the id of the card completing a Set with id1 and id2
+THIRD_CARD = CHUNK_TABLE
+
+
+def check_set(card1, card2, card3):
+    """
+    Given three cards, checks whether they form a Set
+    Looks up the card completing a Set with card1 and card2 and compares it to card3
+    Args: card1, card2, card3 - objects of type Card
+    Returns: True if cards form a Set, False otherwise
+    """
+    return THIRD_CARD[card1.card_id][card2.card_id] == card3.card_id
+
+
+class Card(object):
+    """
+    a Card has attributes of color, shape, number, and shade
+    card_id encodes those attributes as an integer in 0..80
+    Cards are immutable values; use the shared instances in CARDS rather than making new ones
+    How a card is drawn on screen is up to the sprite layer in set.py
+    """
+    __slots__ = ('card_id', 'color', 'shape', 'number', 'shade', 'name')
+
+    def __init__(self, card_id):
+        color, shape, number, shade = card_attributes(card_id)
+        object.__setattr__(self, 'card_id', card_id)
+        object.__setattr__(self, 'color', color)
+        object.__setattr__(self, 'shape', shape)
+        object.__setattr__(self, 'number', number)
+        object.__setattr__(self, 'shade', shade)
+        object.__setattr__(self, 'name', card_name(card_id))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Card is immutable")
+
+    def __eq__(self, other):
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self.card_id == other.card_id
+
+    def __hash__(self):
+        return self.card_id
+
+    # Pickling and copying hand back the shared instance from CARDS, so cards can be
+    # sent to worker processes and still compare and look up like the originals
+    def __reduce__(self):
+        return (card_from_id, (self.card_id,))
+
+    def __repr__(self):
+        return "Card(" + self.name + ")"
+
+
+# the 81 cards of the deck, indexed by card_id
+CARDS = tuple(Card(card_id) for card_id in range(NUM_CARDS))
+
+
+def card_from_id(card_id):
+    """
+    Returns: the shared Card with the given id
+    """
+    return CARDS[card_id]
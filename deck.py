@@ -0,0 +1,77 @@
+# Python Set Game
+# The draw pile
+
+import numbers
+import random
+
+from card_utils import CARDS
+
+
+def new_seed():
+    """
+    Returns a fresh random seed, so that a game started without one can still be replayed
+    """
+    return random.SystemRandom().getrandbits(64)
+
+
+def make_rng(seed=None):
+    """
+    Turns a seed into a random number generator
+    Args: seed - None for an unseeded generator, an int (numpy ints too), or a ready-made
+          random.Random or numpy.random.Generator, which is used as it is
+    Returns: an object with a shuffle method
+    """
+    if seed is None:
+        return random.Random()
+    if isinstance(seed, numbers.Integral):
+        return random.Random(int(seed))
+    return seed
+
+
+def spawn_rngs(seed, count):
+    """
+    Makes independent generators for parallel games, such as one per simulation worker
+    Uses numpy's SeedSequence, whose children are guaranteed not to overlap
+    Args: seed - an int, or None for fresh entropy
+          count - how many generators to make
+    Returns: list of count numpy.random.Generator objects
+    """
+    import numpy as np
+
+    children = np.random.SeedSequence(seed).spawn(count)
+    return [np.random.default_rng(child) for child in children]
+
+
+class Deck:
+    """
+    A Deck is the pile of cards not dealt yet, shuffled once when the game starts
+    Dealing takes cards off the top of the pile, so drawing k cards costs O(k)
+    no matter how many cards have been dealt already
+    The whole deal order follows from rng, so a seeded rng gives a reproducible game
+    """
+    def __init__(self, cards=CARDS, rng=None):
+        self.pile = list(cards)
+        make_rng(rng).shuffle(self.pile)
+
+    def __len__(self):
+        return len(self.pile)
+
+    def peek(self, number):
+        """
+        Returns: list of the next number cards draw() would hand out, in the same order,
+                 without taking them off the pile
+        """
+        top = max(len(self.pile) - number, 0)
+        return self.pile[top:][::-1]
+
+    def draw(self, number):
+        """
+        Takes cards off the top of the pile
+        Args: number - how many cards to draw
+        Returns: list of the cards drawn, shorter than number if the pile runs out
+        """
+        top = max(len(self.pile) - number, 0)
+        drawn = self.pile[top:]
+        del self.pile[top:]
+        drawn.reverse()
+        return drawn
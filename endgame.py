@@ -0,0 +1,144 @@
+# Python Set Game
+# Looking ahead to the end of the deck: can the game still be cleared, and how many
+# cards will be left on the board with perfect play?
+
+from card_utils import CARDS, ENGINE
+from bitboard import card_ids, popcount
+from game_core import BOARD_SIZE
+
+
+def _board_sets(board):
+    """
+    Yields every Set on a board given as a bitmask of card ids, as a 3-bit mask
+    """
+    for id1, id2, id3 in ENGINE.iter_sets(list(card_ids(board))):
+        yield (1 << id1) | (1 << id2) | (1 << id3)
+
+
+def _has_set(board):
+    for _ in _board_sets(board):
+        return True
+    return False
+
+
+class EndgameAnalyzer:
+    """
+    An EndgameAnalyzer plays out every choice of Sets against a known deck order
+    It follows the GameCore rules with auto_add3: after a Set the board is refilled
+    to 12 cards, and while there is no Set three more cards are dealt
+    Boards are bitmasks of card ids, and the result for each (board, cards drawn)
+    state is remembered, so asking again after every move of the same game only
+    explores states that have not been seen yet
+    The search grows with the number of cards left, so it is meant for the end of
+    the deck; near the start of a game it can take a long time
+    """
+    def __init__(self, pile_ids):
+        """
+        Args: pile_ids - ids of the cards left in the deck, in the order they will be dealt
+        """
+        self.pile = list(pile_ids)
+        self.memo = {}
+
+    def _deal_until_set(self, board, drawn):
+        while drawn < len(self.pile) and not _has_set(board):
+            for card_id in self.pile[drawn:drawn + 3]:
+                board |= 1 << card_id
+            drawn = min(drawn + 3, len(self.pile))
+        return board, drawn
+
+    def _after_set(self, board, drawn, set_mask):
+        """
+        Returns: the (board, cards drawn) state after taking the Set set_mask
+        """
+        board &= ~set_mask
+        refill = min(max(BOARD_SIZE - popcount(board), 0), 3, len(self.pile) - drawn)
+        for card_id in self.pile[drawn:drawn + refill]:
+            board |= 1 << card_id
+        return self._deal_until_set(board, drawn + refill)
+
+    def stranded(self, board, drawn=0):
+        """
+        Returns: the fewest cards that can be left on the board at the end of the game,
+                 starting from the given board with drawn cards of the pile already dealt
+        """
+        key = (board, drawn)
+        if key in self.memo:
+            return self.memo[key][0]
+        best = None
+        best_set = None
+        for set_mask in _board_sets(board):
+            left = self.stranded(*self._after_set(board, drawn, set_mask))
+            if best is None or left < best:
+                best = left
+                best_set = set_mask
+                if best == 0:
+                    break
+        if best is None:
+            if drawn < len(self.pile):
+                best = self.stranded(*self._deal_until_set(board, drawn))
+            else:
+                best = popcount(board)
+        self.memo[key] = (best, best_set)
+        return best
+
+    def best_set(self, board, drawn=0):
+        """
+        Returns: the mask of a Set to take that leaves the fewest cards at the end, or None
+        """
+        self.stranded(board, drawn)
+        return self.memo[(board, drawn)][1]
+
+
+def board_mask(cards):
+    """
+    Returns: the bitmask of card ids of a list of cards
+    """
+    mask = 0
+    for card in cards:
+        mask |= 1 << card.card_id
+    return mask
+
+
+class Lookahead:
+    """
+    A Lookahead follows one GameCore, answering questions about how its game can end
+    Make it once per game: it reads the deck order when created, and reuses what it
+    has worked out as the game goes on
+    """
+    def __init__(self, core):
+        self.core = core
+        self.analyzer = EndgameAnalyzer([card.card_id for card in reversed(core.deck.pile)])
+        self.pile_size = len(core.deck)
+
+    def _state(self):
+        return board_mask(self.core.in_play_cards), self.pile_size - len(self.core.deck)
+
+    def stranded(self):
+        """
+        Returns: the fewest cards perfect play leaves on the board from here
+        """
+        return self.analyzer.stranded(*self._state())
+
+    def perfect_sets(self):
+        """
+        Returns: the number of Sets the game ends with under perfect play from here,
+                 counting those already found
+        """
+        cards_left = len(self.core.in_play_cards) + len(self.core.deck)
+        return self.core.sets_found + (cards_left - self.stranded()) // 3
+
+    def can_clear(self):
+        """
+        Checks whether the game can still end with no cards on the board
+        """
+        return self.stranded() == 0
+
+    def best_set(self):
+        """
+        Returns: a Set on the board, as a tuple of three cards, that leads to the fewest
+                 stranded cards, or None if there is no Set
+        """
+        set_mask = self.analyzer.best_set(*self._state())
+        if set_mask is None:
+            return None
+        return tuple(CARDS[card_id] for card_id in card_ids(set_mask))
@@ -0,0 +1,177 @@
+# Python Set Game
+# The rules of a game of Set, with no pygame: dealing, Sets, scoring, hints and winning
+
+from card_utils import check_set
+from board import Board
+from bitboard import BitBoard
+from hints import find_hint_set
+from deck import Deck, make_rng, new_seed
+from replay_log import DEAL, SET_FOUND, WRONG_SET, HINT, PLUS3, NO_CARD
+
+BOARD_SIZE = 12
+
+
+class GameCore:
+    """
+    A GameCore plays out one game of Set without drawing anything
+    Game in set.py shows one on screen, while simulations and servers can use it directly
+    seed decides the whole deal: an int, a random.Random or numpy Generator,
+    or None to pick a fresh int seed, kept in self.seed so the game can be replayed
+    auto_add3 deals more cards whenever the board has no Set
+    bitboard keeps the board in a BitBoard instead of a Board
+    recorder, if given, is a replay_log.ReplayWriter that gets every event of the game
+    on_deal, if given, is called with the GameCore and the list of cards each time cards
+    are dealt, starting with the first 12 while the GameCore is being made
+    """
+    def __init__(self, seed=None, auto_add3=True, bitboard=False, num_hints=5, recorder=None,
+                 on_deal=None):
+        if seed is None:
+            seed = new_seed()
+        self.seed = seed
+        self.recorder = recorder
+        self.on_deal = on_deal
+        if recorder is not None:
+            recorder.start_game(seed)
+        self.rng = make_rng(seed)
+        self.deck = Deck(rng=self.rng)
+        self.auto_add3 = auto_add3
+        self.bitboard = bitboard
+
+        if bitboard:
+            self.board = BitBoard()
+        else:
+            self.board = Board()
+        self.out_of_play_cards = []
+
+        self.sets_found = 0
+        self.sets_wrong = 0
+        self.hints_left = num_hints
+
+        # start the game
+        self.add_new_cards(BOARD_SIZE)
+
+    # Add cards to the in-play cards
+    # Number = number of cards to add
+    # Index allows adding 1 card in the same position as a removed card
+    # Does not check whether we SHOULD because assumes we have checked that before calling
+    def add_new_cards(self, number, index=0):
+        self.deal(number, index)
+        if self.auto_add3:
+            self.deal_until_set()
+
+    # Moves up to number cards from the deck onto the board at index
+    # Returns the cards dealt
+    def deal(self, number, index=0):
+        cards = self.deck.draw(number)
+        for card in cards:
+            self.board.insert(index, card)
+            self.record(DEAL, (card,))
+        if self.on_deal is not None and cards:
+            self.on_deal(self, cards)
+        return cards
+
+    # Deals three cards at a time until the board has a Set or the deck is empty
+    # The board updates its Set index as each card goes in, so every check only
+    # costs the work of comparing the new cards against the board
+    def deal_until_set(self):
+        while len(self.deck) > 0 and not self.check_if_any_sets():
+            self.deal(3)
+
+    # Deals new cards into the positions left by removed cards, as long as the
+    # board has fewer than 12 cards, then makes sure the board has a Set
+    def refill(self, indexes):
+        for index in sorted(indexes):
+            if len(self.board) < BOARD_SIZE:
+                self.deal(1, index)
+        if self.auto_add3:
+            self.deal_until_set()
+
+    # Passes an event and the cards it involves on to the recorder, if there is one
+    def record(self, event, cards=()):
+        if self.recorder is not None:
+            self.recorder.record(event, [card.card_id for card in cards])
+
+    # The cards on the board, in display order
+    @property
+    def in_play_cards(self):
+        return self.board.cards
+
+    # Yields each Set on the board exactly once, as a tuple of three cards
+    def find_all_sets(self):
+        for found in self.board.iter_sets():
+            yield found
+
+    # Returns the number of Sets on the board
+    def count_sets(self):
+        return self.board.count_sets()
+
+    # Returns a Set on the board as a tuple of three cards, or None if there is none
+    def find_set(self):
+        return self.board.find_set()
+
+    # Checks if any sets on the board
+    def check_if_any_sets(self):
+        return self.board.has_set()
+
+    # Checks if game is won
+    def check_if_won(self):
+        return (not self.check_if_any_sets()) and len(self.deck) == 0
+
+    # Returns the Set a hint should lead to, building on the selected cards
+    def find_hint_set(self, selected):
+        return find_hint_set(self.board, selected)
+
+    def use_hint(self, selected):
+        """
+        Spends a hint, if any are left
+        Args: selected - list of the cards the player has clicked
+        Returns: the Set the hint leads to, or None if no hints are left or there is
+                 no Set on the board, in which case three cards are dealt instead
+        """
+        if self.hints_left <= 0:
+            return None
+        self.hints_left -= 1
+        found = self.find_hint_set(selected)
+        if found is None:
+            if self.recorder is not None:
+                self.recorder.record(HINT, [NO_CARD] * 3)
+            self.add_new_cards(3)
+        else:
+            self.record(HINT, found)
+        return found
+
+    # Deals three more cards, only if there is no Set on the board
+    # Returns True if cards were dealt
+    def add_three(self):
+        self.record(PLUS3)
+        if self.check_if_any_sets():
+            return False
+        self.add_new_cards(3)
+        return True
+
+    def submit(self, cards):
+        """
+        Plays three selected cards
+        A Set is taken off the board and its positions refilled, anything else counts as wrong
+        Args: cards - list of three different cards on the board
+        Returns: True if the cards formed a Set, False otherwise
+        Raises: ValueError, before changing anything, if cards are not three different
+                cards on the board
+        """
+        if len(cards) != 3 or len(set(cards)) != 3:
+            raise ValueError("a Set is three different cards")
+        for card in cards:
+            if card not in self.board:
+                raise ValueError(repr(card) + " is not on the board")
+        if not check_set(cards[0], cards[1], cards[2]):
+            self.record(WRONG_SET, cards)
+            self.sets_wrong += 1
+            return False
+        self.record(SET_FOUND, cards)
+        self.sets_found += 1
+        indexes = [self.board.position(card) for card in cards]
+        for card in cards:
+            self.out_of_play_cards.append(card)
+            self.board.remove(card)
+        self.refill(indexes)
+        return True
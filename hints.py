@@ -0,0 +1,64 @@
+# Python Set Game
+# Hints that build on the cards the player has already selected
+
+from card_utils import THIRD_CARD
+
+
+def _complete_pair(board, card1, card2):
+    """
+    Returns: the Set made of card1, card2 and the card completing them, or None if
+    that card is not on the board
+    """
+    third = board.by_id.get(THIRD_CARD[card1.card_id][card2.card_id])
+    if third is None or card1.card_id == card2.card_id:
+        return None
+    return (card1, card2, third)
+
+
+def _complete_card(board, card):
+    """
+    Returns: a Set on the board containing card, or None if there is none
+    Completes card with each other card on the board, so runs in O(n)
+    """
+    if card.card_id not in board.by_id:
+        return None
+    for other in board.cards:
+        found = _complete_pair(board, card, other)
+        if found is not None:
+            return found
+    return None
+
+
+def find_hint_set(board, selected):
+    """
+    Finds the Set a hint should point towards
+    Keeps as much of the player's selection as still leads to a Set: both selected cards
+    if their third card is on the board, otherwise one of them, otherwise a fresh Set
+    Args: board - a Board or BitBoard
+          selected - list of the cards currently clicked, in any order
+    Returns: tuple of three cards forming a Set, or None if there is no Set on the board
+    """
+    if len(selected) >= 2:
+        found = _complete_pair(board, selected[0], selected[1])
+        if found is not None and (len(selected) == 2 or found[2] == selected[2]):
+            return found
+    for card in selected:
+        found = _complete_card(board, card)
+        if found is not None:
+            return found
+    return board.find_set()
+
+
+def hint_selection(selected, found):
+    """
+    Works out what the player has selected after a hint pointing at found
+    Selected cards outside found are dropped and the next card of found is added
+    Args: selected - list of the cards clicked before the hint
+          found - the Set the hint leads to, from find_hint_set
+    Returns: list of the cards clicked after the hint
+    """
+    kept = [card for card in selected if card in found]
+    for card in found:
+        if card not in kept:
+            return kept + [card]
+    return kept
@@ -202,6 +202,8 @@ class Plane:
         self.sync_master_plane = None
         self.offset = None
 
+        STATS.new_planes += 1
+
         return
 
     def sub(self, plane, insert_after = None):
@@ -921,11 +923,11 @@ class Display(Plane):
            If force is True, blit to Pygame display regardless.
         """
 
-        starttime = time.clock()
+        starttime = time.perf_counter()
 
         rendered_something = Plane.render(self)
 
-        STATS.log_render_time(time.clock() - starttime)
+        STATS.log_render_time(time.perf_counter() - starttime)
 
         if rendered_something or force or self.dragged_plane is not None:
 
@@ -989,6 +991,13 @@ class Display(Plane):
 
             y += lineheight
 
+            self._stats_surface.blit(self.font.render("New planes: {}".format(STATS.new_planes),
+                                                      antialias,
+                                                      color,
+                                                      background), (padding, y))
+
+            y += lineheight
+
             self._stats_surface.blit(self.font.render("Unchanged planes: {}".format(STATS.unchanged_planes),
                                                       antialias,
                                                       color,
@@ -1049,6 +1058,11 @@ class Stats:
        Stats.total_pixels
            Total number of pixels allocated for all planes.
 
+       Stats.new_planes
+           Number of planes created since the last update. Creating planes
+           in every frame allocates a new Surface each time, and the planes
+           always count as changed when rendered.
+
        Stats.unchanged_planes
            Number of planes whose bitmap did not change in the last run.
 
@@ -1082,6 +1096,8 @@ class Stats:
 
         self.total_pixels = 0
 
+        self.new_planes = 0
+
         self.unchanged_planes = 0
 
         self.render_skip = 0
@@ -1106,6 +1122,8 @@ class Stats:
 
         self.total_pixels = 0
 
+        self.new_planes = 0
+
         self.unchanged_planes = 0
 
         self.render_skip = 0
@@ -288,6 +288,29 @@ class Fonts:
 #
 FONTS = Fonts()
 
+# Styles created before a display was available. Their images can only be
+# converted to the display format once there is one, see convert_styles().
+#
+UNCONVERTED_STYLES = []
+
+def convert_styles():
+    """Convert the images of all styles created so far to the display format.
+       Call this as soon as a planes.Display exists. Styles created after that
+       convert their images right away.
+    """
+
+    if pygame.display.get_surface() is None:
+
+        return
+
+    for style in UNCONVERTED_STYLES:
+
+        style.convert()
+
+    del UNCONVERTED_STYLES[:]
+
+    return
+
 def draw_border(plane, color):
     """Draw a border around plane.
     """
@@ -86,8 +86,6 @@ class LMRStyle:
            left_img, mid_img and right_img are the respective image file names.
         """
 
-        # TODO: convert_alpha() should be called as soon as a display is available.
-
         self.left_img = pygame.image.load(left_img)
 
         self.mid_img = pygame.image.load(mid_img)
@@ -96,6 +94,30 @@ class LMRStyle:
 
         self.text_color = text_color
 
+        # Convert to the display format now if possible, otherwise
+        # planes.gui.convert_styles() will do it.
+        #
+        if pygame.display.get_surface() is None:
+
+            planes.gui.UNCONVERTED_STYLES.append(self)
+
+        else:
+
+            self.convert()
+
+        return
+
+    def convert(self):
+        """Convert the images to the display format, keeping their alpha channel.
+           Needs a display.
+        """
+
+        self.left_img = self.left_img.convert_alpha()
+
+        self.mid_img = self.mid_img.convert_alpha()
+
+        self.right_img = self.right_img.convert_alpha()
+
         return
 
 # Create some default styles
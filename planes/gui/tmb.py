@@ -77,14 +77,36 @@ class TMBStyle:
            top_img, mid_img and bottom_img are the respective image file names.
         """
 
-        # TODO: convert_alpha() should be called as soon as a display is available.
-
         self.top_img = pygame.image.load(top_img)
 
         self.mid_img = pygame.image.load(mid_img)
 
         self.bottom_img = pygame.image.load(bottom_img)
 
+        # Convert to the display format now if possible, otherwise
+        # planes.gui.convert_styles() will do it.
+        #
+        if pygame.display.get_surface() is None:
+
+            planes.gui.UNCONVERTED_STYLES.append(self)
+
+        else:
+
+            self.convert()
+
+        return
+
+    def convert(self):
+        """Convert the images to the display format, keeping their alpha channel.
+           Needs a display.
+        """
+
+        self.top_img = self.top_img.convert_alpha()
+
+        self.mid_img = self.mid_img.convert_alpha()
+
+        self.bottom_img = self.bottom_img.convert_alpha()
+
         return
 
 # Create some default styles
@@ -0,0 +1,221 @@
+# Python Set Game
+# Re-runs recorded games from a replay log, to check the rules still play them the same way
+# and to time them as a benchmark
+#
+# Usage: python replay.py FILE [--view] [--no-auto-add3] [--bitboard] [--hints N]
+
+import argparse
+import time
+
+from card_utils import CARDS
+from game_core import GameCore
+from hints import hint_selection
+from replay_log import (EventList, read_games, EVENT_NAMES,
+                        GAME_START, DEAL, CLICK, SET_FOUND, WRONG_SET, HINT, PLUS3)
+
+# the events that come from the player; every other event is a consequence of these
+INPUT_EVENTS = (CLICK, HINT, PLUS3)
+
+
+class HeadlessPlayer:
+    """
+    Plays inputs into a GameCore the way Game does on screen, without pygame
+    Three clicked cards are submitted at once and in board order, as Game.update
+    does on the next frame
+    """
+    def __init__(self, seed, recorder, auto_add3=True, bitboard=False, num_hints=5):
+        self.core = GameCore(seed, auto_add3, bitboard, num_hints, recorder)
+        self.selected = []
+
+    def click(self, card):
+        self.core.record(CLICK, (card,))
+        if card not in self.core.board:
+            return  # the replay has already diverged
+        if card in self.selected:
+            self.selected.remove(card)
+        else:
+            self.selected.append(card)
+        self._submit_if_full()
+
+    def hint(self):
+        # Game hands the selection over in board order, and the hint depends on it
+        selected = sorted(self.selected, key=self.core.board.position)
+        found = self.core.use_hint(selected)
+        if found is not None:
+            self.selected = hint_selection(selected, found)
+        self._submit_if_full()
+
+    def plus3(self):
+        self.core.add_three()
+
+    def _submit_if_full(self):
+        if len(self.selected) == 3:
+            self.core.submit(sorted(self.selected, key=self.core.board.position))
+            self.selected = []
+
+
+class ViewPlayer:
+    """
+    Plays inputs into a full Game with its Model and View, drawing a frame after each one
+    Needs pygame, and a display (SDL_VIDEODRIVER=dummy works without a screen)
+    """
+    def __init__(self, seed, recorder, auto_add3=True, bitboard=False, num_hints=5):
+        import pygame
+        pygame.init()
+        import planes
+        import set as set_game
+        from assets import convert_assets
+
+        set_game.AUTO_ADD3 = auto_add3
+        set_game.BITBOARD = bitboard
+        set_game.NUM_HINTS = num_hints
+        self.screen = planes.Display((set_game.WINDOW_WIDTH, set_game.WINDOW_HEIGHT))
+        convert_assets()
+        self.model = set_game.Model(seed, recorder)
+        self.view = set_game.View(self.model, self.screen)
+        self.core = self.model.game.core
+        self._frame()
+
+    def _frame(self):
+        self.model.update()
+        self.screen.update()
+        self.screen.render()
+        self.view.draw()
+
+    def click(self, card):
+        if card not in self.core.board:
+            self.core.record(CLICK, (card,))
+            return  # the replay has already diverged
+        self.model.game.sprite(card).clicked("left")
+        self._frame()
+
+    def hint(self):
+        self.model.game.use_hint()
+        self._frame()
+
+    def plus3(self):
+        self.core.add_three()
+        self._frame()
+
+
+class ReplayResult:
+    """
+    The outcome of replaying one recorded game
+    divergences - list of (index, recorded event, replayed event) where the two differ
+    timings - dict from input event to the list of seconds each one took to replay
+    board_matches, scores_match - whether the final board and the Set counts agree
+    """
+    def __init__(self, seed):
+        self.seed = seed
+        self.divergences = []
+        self.timings = dict((event, []) for event in INPUT_EVENTS)
+        self.board_matches = False
+        self.scores_match = False
+
+    def ok(self):
+        return not self.divergences and self.board_matches and self.scores_match
+
+
+def _final_state(events):
+    """
+    Works out the final board and Set counts from a recorded game
+    Returns: tuple (set of card ids on the board, sets found, wrong sets)
+    """
+    board = set()
+    found = 0
+    wrong = 0
+    for event, payload in events:
+        if event == DEAL:
+            board.add(payload[0])
+        elif event == SET_FOUND:
+            board.difference_update(payload)
+            found += 1
+        elif event == WRONG_SET:
+            wrong += 1
+    return board, found, wrong
+
+
+def replay_game(game, view=False, auto_add3=True, bitboard=False, num_hints=5):
+    """
+    Replays one recorded game from its seed and its player inputs
+    Every event the replay produces is compared with the recording, ignoring times
+    Args: game - list of events of one game, as read_games returns them
+          view - True to drive a full Game and draw every frame, False for a bare GameCore
+          auto_add3, bitboard, num_hints - the settings the game was played with
+    Returns: a ReplayResult
+    """
+    seed = game[0][2]
+    if game[0][0] != GAME_START or seed is None:
+        raise ValueError("the recorded game has no seed to replay it from")
+    recorded = [(event, payload) for event, _, payload in game[1:]]
+
+    produced = EventList()
+    player_class = ViewPlayer if view else HeadlessPlayer
+    player = player_class(seed, produced, auto_add3, bitboard, num_hints)
+
+    result = ReplayResult(seed)
+    actions = {CLICK: lambda payload: player.click(CARDS[payload[0]]),
+               HINT: lambda payload: player.hint(),
+               PLUS3: lambda payload: player.plus3()}
+    for event, payload in recorded:
+        if event in INPUT_EVENTS:
+            start = time.perf_counter()
+            actions[event](payload)
+            result.timings[event].append(time.perf_counter() - start)
+
+    replayed = produced.events[1:]
+    for index in range(max(len(recorded), len(replayed))):
+        expected = recorded[index] if index < len(recorded) else None
+        got = replayed[index] if index < len(replayed) else None
+        if expected != got:
+            result.divergences.append((index, expected, got))
+
+    board, found, wrong = _final_state(recorded)
+    result.board_matches = board == set(card.card_id for card in player.core.in_play_cards)
+    result.scores_match = (found, wrong) == (player.core.sets_found, player.core.sets_wrong)
+    return result
+
+
+def describe(event):
+    if event is None:
+        return "nothing"
+    return EVENT_NAMES[event[0]] + " " + str(list(event[1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded games of Set")
+    parser.add_argument("file", help="replay log written by set.py")
+    parser.add_argument("--view", action="store_true", help="draw every frame with pygame")
+    parser.add_argument("--no-auto-add3", action="store_true")
+    parser.add_argument("--bitboard", action="store_true")
+    parser.add_argument("--hints", type=int, default=5, help="hints per game")
+    args = parser.parse_args()
+
+    timings = dict((event, []) for event in INPUT_EVENTS)
+    failed = 0
+    games = read_games(args.file)
+    for number, game in enumerate(games):
+        try:
+            result = replay_game(game, args.view, not args.no_auto_add3, args.bitboard, args.hints)
+        except ValueError as error:
+            failed += 1
+            print("game " + str(number) + " could not be replayed: " + str(error))
+            continue
+        for event in INPUT_EVENTS:
+            timings[event] += result.timings[event]
+        if not result.ok():
+            failed += 1
+            print("game " + str(number) + " (seed " + str(result.seed) + ") diverged")
+            for index, expected, got in result.divergences[:5]:
+                print("  event " + str(index) + ": recorded " + describe(expected) +
+                      ", replayed " + describe(got))
+
+    print(str(len(games) - failed) + " of " + str(len(games)) + " games replayed the same")
+    for event in INPUT_EVENTS:
+        if timings[event]:
+            mean = sum(timings[event]) / len(timings[event])
+            print(EVENT_NAMES[event] + ": " + str(len(timings[event])) + " events, mean " +
+                  "%.3f" % (mean * 1000) + " ms, max " + "%.3f" % (max(timings[event]) * 1000) + " ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# Python Set Game
+# A compact, append-only binary log of everything that happens in a game
+#
+# Every record is one event byte, the milliseconds since the previous record as a
+# varint, then a payload whose width depends only on the event:
+#   GAME_START  varint seed + 1 (0 if the game was not seeded with an integer); its time
+#               field is the wall-clock time in ms instead of a difference
+#   DEAL        card id
+#   CLICK       card id
+#   SET_FOUND   three card ids
+#   WRONG_SET   three card ids
+#   HINT        three card ids of the Set hinted at, NO_CARD if there was none
+#   PLUS3       nothing
+# A whole game takes a few hundred bytes, mostly one byte of time per record.
+
+import numbers
+import queue
+import threading
+import time
+
+GAME_START = 0
+DEAL = 1
+CLICK = 2
+SET_FOUND = 3
+WRONG_SET = 4
+HINT = 5
+PLUS3 = 6
+
+EVENT_NAMES = ["GAME_START", "DEAL", "CLICK", "SET_FOUND", "WRONG_SET", "HINT", "PLUS3"]
+
+# number of card id bytes after the time of each event, GAME_START aside
+PAYLOAD_SIZE = {DEAL: 1, CLICK: 1, SET_FOUND: 3, WRONG_SET: 3, HINT: 3, PLUS3: 0}
+
+NO_CARD = 255
+
+FLUSH_SIZE = 4096
+
+
+def encode_varint(value, out):
+    """
+    Appends value to the bytearray out, 7 bits per byte, lowest bits first
+    """
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(data, pos):
+    """
+    Reads a varint from data starting at pos
+    Returns: tuple (value, position after the varint)
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class ReplayWriter:
+    """
+    A ReplayWriter appends the events of one or more games to a replay file
+    Records are gathered in memory and handed to a background thread in blocks of
+    FLUSH_SIZE bytes, so recording an event never waits for the disk
+    GameCore calls record() for every event once a writer is passed to it
+    """
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self.buffer = bytearray()
+        self.last_ms = 0
+        self.blocks = queue.Queue()
+        self.thread = threading.Thread(target=self._write_blocks)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _write_blocks(self):
+        with open(self.path, "ab") as replay_file:
+            while True:
+                block = self.blocks.get()
+                if block is None:
+                    return
+                replay_file.write(block)
+                replay_file.flush()
+
+    def _now_ms(self):
+        return int(self.clock() * 1000)
+
+    def start_game(self, seed):
+        """
+        Starts a new game in the log
+        Args: seed - the integer seed of the game, or anything else if the game cannot be
+              replayed from a seed
+        """
+        now = self._now_ms()
+        self.buffer.append(GAME_START)
+        encode_varint(now, self.buffer)
+        if isinstance(seed, numbers.Integral) and seed >= 0:
+            encode_varint(int(seed) + 1, self.buffer)
+        else:
+            encode_varint(0, self.buffer)
+        self.last_ms = now
+        self._maybe_flush()
+
+    def record(self, event, card_ids=()):
+        """
+        Appends one event
+        Args: event - one of DEAL, CLICK, SET_FOUND, WRONG_SET, HINT, PLUS3
+              card_ids - the payload, PAYLOAD_SIZE[event] card ids
+        """
+        if len(card_ids) != PAYLOAD_SIZE[event]:
+            raise ValueError(EVENT_NAMES[event] + " takes " + str(PAYLOAD_SIZE[event]) + " card ids")
+        now = self._now_ms()
+        self.buffer.append(event)
+        encode_varint(max(now - self.last_ms, 0), self.buffer)
+        self.buffer.extend(card_ids)
+        self.last_ms = now
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if len(self.buffer) >= FLUSH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """
+        Hands everything recorded so far to the writer thread
+        """
+        if self.buffer:
+            self.blocks.put(bytes(self.buffer))
+            self.buffer = bytearray()
+
+    def close(self):
+        """
+        Writes out everything recorded and waits for the file to be closed
+        """
+        self.flush()
+        self.blocks.put(None)
+        self.thread.join()
+
+
+class EventList:
+    """
+    An EventList stands in for a ReplayWriter and keeps the events in memory
+    events holds tuples (event, payload) in the order they happened, without times
+    """
+    def __init__(self):
+        self.events = []
+
+    def start_game(self, seed):
+        self.events.append((GAME_START, seed))
+
+    def record(self, event, card_ids=()):
+        self.events.append((event, tuple(card_ids)))
+
+
+def read_events(data):
+    """
+    Decodes the records of a replay log
+    Args: data - the bytes of a replay file
+    Returns: generator of tuples (event, time in ms since the epoch, payload), where the
+             payload is the seed (or None) for GAME_START and a tuple of card ids otherwise
+    """
+    pos = 0
+    now = 0
+    while pos < len(data):
+        event = data[pos]
+        pos += 1
+        if event == GAME_START:
+            now, pos = decode_varint(data, pos)
+            seed, pos = decode_varint(data, pos)
+            yield event, now, (seed - 1 if seed else None)
+            continue
+        if event not in PAYLOAD_SIZE:
+            raise ValueError("unknown replay event " + str(event) + " at byte " + str(pos - 1))
+        delta, pos = decode_varint(data, pos)
+        now += delta
+        size = PAYLOAD_SIZE[event]
+        yield event, now, tuple(bytearray(data[pos:pos + size]))
+        pos += size
+
+
+def read_games(path):
+    """
+    Reads a replay file and splits it into games
+    Returns: list of games, each a list of events as given by read_events, starting with GAME_START
+    """
+    with open(path, "rb") as replay_file:
+        data = bytearray(replay_file.read())
+    games = []
+    for record in read_events(data):
+        if record[0] == GAME_START:
+            games.append([])
+        if games:
+            games[-1].append(record)
+    return games
@@ -1,7 +1,6 @@
 # Anne LoVerso
 # Python Set Game
 
-import random
 import time
 
 import pygame
@@ -11,11 +10,17 @@ import planes.gui
 
 from class_utils import Button
 from class_utils import ScreenText
+from assets import card_face, prefetch_card_faces, image, convert_assets
+from game_core import GameCore
+from hints import hint_selection
+from replay_log import ReplayWriter, CLICK
 
 ####################
 # DEFINE CONSTANTS #
 ####################
 AUTO_ADD3 = True
+BITBOARD = False  # track the board, deck and discard pile as 81-bit integers
+REPLAY_FILE = None  # path of a binary replay log to append every game to
 
 WINDOW_WIDTH = 1000
 WINDOW_HEIGHT = 700
@@ -36,44 +41,13 @@ RED = (255, 0, 0)
 
 HINTS = False
 NUM_HINTS = 5
+PREFETCH_FACES = 6  # card faces decoded in the background ahead of the deal
+SHOW_STATS = False  # draw the planes render statistics over the game
 TIME_DEDUC = 3000
 
 FONT_BIG = pygame.font.SysFont("Arial", 40)
 FONT_SMALL = pygame.font.SysFont("Arial", 20)
 
-COLORS = ['green', 'red', 'purple']
-SHAPES = ['oval', 'diamond', 'squiggle']
-NUMBERS = [1, 2, 3]
-SHADES = ['filled', 'shaded', 'empty']
-
-
-def check_set(card1, card2, card3):
-    """
-    Given three cards, checks whether they form a Set
-    Args: card1, card2, card3 - objects of type Card
-    Returns: True if cards form a Set, False otherwise
-    """
-    color_check = all_same_or_all_diff(card1.color, card2.color, card3.color)
-    shape_check = all_same_or_all_diff(card1.shape, card2.shape, card3.shape)
-    num_check = all_same_or_all_diff(card1.number, card2.number, card3.number)
-    shade_check = all_same_or_all_diff(card1.shade, card2.shade, card3.shade)
-    return color_check and shape_check and num_check and shade_check
-
-
-def all_same_or_all_diff(attr1, attr2, attr3):
-    """
-    Given three attributes (one from each of three cards), checks whether the
-    they are either all the same, or all different
-    Functions as a helper method to check_set
-    Args: attr1, attr2, attr3 - attributes of a card (color, shape, number, shade)
-    Returns: True if all three attributes are equal OR none of them are equal, False otherwise
-    """
-    if attr1 == attr2 and attr2 == attr3:
-        return True
-    elif (attr1 != attr2) and (attr2 != attr3) and (attr3 != attr1):
-        return True
-    else:
-        return False
 
 def format_secs(secs):
     """
@@ -84,29 +58,22 @@ def format_secs(secs):
     seconds = secs % 60
     return str(minutes) + "m " + str(seconds) + "s"
 
-class Card(planes.Plane):
+class CardSprite(planes.Plane):
     """
-    a Card has attributes of color, shape, number, and shade
+    a CardSprite is the on-screen plane showing one Card
+    it also remembers whether the player has clicked that card
+    on_click, if set, is called with the card whenever the player clicks it
     """
-    def __init__(self, name, color, shape, number, shade):
-        planes.Plane.__init__(self, name, pygame.Rect(0, 0, CARD_WIDTH, CARD_HEIGHT), False, False)
-        self.color = color
-        self.shape = shape
-        self.number = number
-        self.shade = shade
+    def __init__(self, card):
+        planes.Plane.__init__(self, card.name, pygame.Rect(0, 0, CARD_WIDTH, CARD_HEIGHT), False, False)
+        self.card = card
         self.been_clicked = False
-
-    def __eq__(self, other):
-        return  self.color == other.color and \
-                self.shape == other.shape and \
-                self.number == other.number and \
-                self.shade == other.shade
-
-    def __ne__(self, other):
-        return not self.__eq__(other)
+        self.on_click = None
 
     def clicked(self, button_name):
         self.been_clicked = not self.been_clicked
+        if self.on_click is not None:
+            self.on_click(self.card)
 
     def update(self):
         pass
@@ -121,78 +88,52 @@ class AddThreeCardsButton(Button):
     """When clicked, adds three new cards if no Set on the board"""
     def __init__(self, name, rect, callback, model):
         Button.__init__(self, name, rect, callback, model)
-        self.image = pygame.image.load("img/plus3_icon.png")
+        self.image = image("img/plus3_icon.png")
 
     def clicked(self, button_name):
         if self.model.check_in_play():
-            if not self.model.check_if_any_sets():
-                self.model.add_new_cards(3)
+            self.model.core.add_three()
 
 
 # GAME BUTTON
 class HintButton(Button):
     """
     When clicked, gives a hint
-    If Set on the board: highlights the next card in the Set
+    If Set on the board: highlights the next card in a Set, completing the cards
+    already clicked when they are part of one and unclicking them otherwise
     If no Set on board: adds three new cards
-    Ignores cards already clicked, so user should not click when cards are highlighted
     """
     def __init__(self, name, rect, callback, model):
         Button.__init__(self, name, rect, callback, model)
-        self.image = pygame.image.load("img/hint_icon.png")
+        self.image = image("img/hint_icon.png")
 
     def clicked(self, button_name):
         if self.model.check_in_play():
-            if self.model.hints_left > 0:
-                self.model.hints_left -= 1
-                for card1 in self.model.in_play_cards:
-                    for card2 in self.model.in_play_cards:
-                        for card3 in self.model.in_play_cards:
-                            if card1 != card2 and card2 != card3 and card1 != card3:
-                                if check_set(card1, card2, card3):
-                                    if not card1.been_clicked:
-                                        card1.been_clicked = True
-                                        return
-                                    elif not card2.been_clicked:
-                                        card2.been_clicked = True
-                                        return
-                                    else:
-                                        card3.been_clicked = True
-                                        return
-                self.model.add_new_cards(3)
+            self.model.use_hint()
 
 
 # HOME BUTTON
 class Game():
     """
     A Game is a single game that ends when won, lost or cancelled
+    It shows a GameCore on screen: the rules are in self.core, the planes are here
+    seed decides the whole deal and recorder logs the game, see GameCore
     """
-    def __init__(self, model):
+    def __init__(self, model, seed=None, recorder=None):
         ########################
         # GAME SCREEN ELEMENTS #
         ########################
-        self.deck = []
         self.model = model
 
-        #  make 81 unique cards, add to deck
-        for color in COLORS:
-            for shape in SHAPES:
-                for number in NUMBERS:
-                    for shade in SHADES:
-                        card_to_add = Card(color + shape + shade + str(number),
-                                           color, shape, number, shade)
-                        self.deck.append(card_to_add)
-                        card_to_add.image = pygame.image.load("img/" + card_to_add.name + ".png")
+        # on-screen planes for the cards, by card_id, made when a card is first dealt
+        # so a new Game only builds planes for the cards it shows, see sprite
+        self.sprites = {}
 
-        self.actors = []
+        self.core = GameCore(seed, AUTO_ADD3, BITBOARD, NUM_HINTS, recorder, self.cards_dealt)
 
-        self.in_play_cards = []
+        self.actors = []
         self.clicked_cards = []
-        self.out_of_play_cards = []
-
-        self.sets_found = 0
-        self.sets_wrong = 0 # should we take off points for these?
-        self.hints_left = NUM_HINTS
+        self.click_boxes = {}  # highlight planes behind clicked cards, by card_id
 
         #### Elements of a game ####
         self.sets_found_label = ScreenText("sets_found_label",
@@ -200,7 +141,7 @@ class Game():
                                            pygame.Rect(3*WINDOW_WIDTH/4, 290, WINDOW_WIDTH/4, 50),
                                            FONT_BIG)
         self.left_in_deck_label = ScreenText("left_in_deck_label",
-                                             "Deck: " + str(len(self.deck) - (len(self.in_play_cards) + len(self.out_of_play_cards))),
+                                             "Deck: " + str(len(self.deck)),
                                              pygame.Rect(3*WINDOW_WIDTH/4, 505, WINDOW_WIDTH/4, 25),
                                              FONT_SMALL)
         if not AUTO_ADD3:
@@ -221,7 +162,7 @@ class Game():
         self.logo = planes.Plane("setlogo",
                                  pygame.Rect(3*WINDOW_WIDTH/4, 50, 240, 162),
                                  False, False)
-        self.logo.image = pygame.image.load("img/set.jpg")
+        self.logo.image = image("img/set.jpg")
 
         #### CATEGORIES ####
         self.gamebuttons = [self.logo]
@@ -232,40 +173,90 @@ class Game():
         if not AUTO_ADD3:
             self.gamebuttons.append(self.add3_button)
 
-        # start the game
-        self.add_new_cards(12)
+    # The rules live in self.core; these are the parts of it the screen shows
+    @property
+    def in_play_cards(self):
+        return self.core.in_play_cards
 
-    # Add cards to the in-play cards
-    # Number = number of cards to add
-    # Index allows adding 1 card in the same position as a removed card
-    # Does not check whether we SHOULD because assumes we have checked that before calling
-    def add_new_cards(self, number, index=0):
-        if not len(self.in_play_cards) + len(self.out_of_play_cards) == len(self.deck):
-            i = 0
-            while i < number:
-                num = random.randint(0, len(self.deck)-1)
-                card = self.deck[num]
-                if card not in self.in_play_cards and card not in self.out_of_play_cards:
-                    self.in_play_cards.insert(index, card)
-                    i += 1
-            if AUTO_ADD3:
-                if not self.check_if_any_sets():
-                    self.add_new_cards(3)
+    @property
+    def deck(self):
+        return self.core.deck
+
+    @property
+    def sets_found(self):
+        return self.core.sets_found
+
+    @property
+    def hints_left(self):
+        return self.core.hints_left
+
+    # Yields each Set on the board exactly once, as a tuple of three cards
+    def find_all_sets(self):
+        return self.core.find_all_sets()
+
+    # Returns the number of Sets on the board
+    def count_sets(self):
+        return self.core.count_sets()
 
     # Checks if any sets on the board
     def check_if_any_sets(self):
-        for card1 in self.in_play_cards:
-            for card2 in self.in_play_cards:
-                for card3 in self.in_play_cards:
-                    if card1 != card2 and card2 != card3 and card1 != card3:
-                        if check_set(card1, card2, card3):
-                            return True
-        return False
+        return self.core.check_if_any_sets()
 
     # Checks if game is won
     def check_if_won(self):
-        return(not self.check_if_any_sets()) and \
-               (len(self.in_play_cards) + len(self.out_of_play_cards) == len(self.deck))
+        return self.core.check_if_won()
+
+    # Add cards to the in-play cards, see GameCore.add_new_cards
+    def add_new_cards(self, number, index=0):
+        self.core.add_new_cards(number, index)
+
+    # The plane that shows card on screen, made the first time it is asked for
+    def sprite(self, card):
+        sprite = self.sprites.get(card.card_id)
+        if sprite is None:
+            sprite = CardSprite(card)
+            sprite.on_click = self.card_clicked
+            self.sprites[card.card_id] = sprite
+        return sprite
+
+    # The highlight shown behind card while it is clicked
+    # Made once per card and reused every frame, all sharing one clickbox image
+    def click_box(self, card):
+        box = self.click_boxes.get(card.card_id)
+        if box is None:
+            box = planes.Plane("box" + card.name,
+                               pygame.Rect(0, 0, CARD_WIDTH + 10, CARD_HEIGHT + 10),
+                               False, False)
+            box.image = image("img/clickbox.png")
+            self.click_boxes[card.card_id] = box
+        return box
+
+    # Called by the core whenever cards are dealt: gives their sprites their faces,
+    # and starts decoding the faces of the next cards in the deck
+    # The faces come from a cache shared by every Game, so only the first game decodes them
+    def cards_dealt(self, core, cards):
+        for card in cards:
+            self.sprite(card).image = card_face(card)
+        prefetch_card_faces(core.deck.peek(PREFETCH_FACES))
+
+    # Called by a card's sprite when the player clicks it
+    def card_clicked(self, card):
+        self.core.record(CLICK, (card,))
+
+    # The cards on the board the player has clicked so far
+    def selected_cards(self):
+        return [card for card in self.in_play_cards if self.sprite(card).been_clicked]
+
+    # Spends a hint and clicks the next card of the Set it leads to
+    def use_hint(self):
+        selected = self.selected_cards()
+        found = self.core.use_hint(selected)
+        if found is not None:
+            after = hint_selection(selected, found)
+            for card in selected:
+                self.sprite(card).been_clicked = card in after
+            for card in after:
+                self.sprite(card).been_clicked = True
 
     # Game can only be lost if playing in time mode
     def check_in_play(self):
@@ -279,7 +270,7 @@ class Game():
             self.actors += self.gamelabels + self.gamebuttons
             if HINTS:
                 self.hints_left_label.update_text("Hints Remaining: " + str(self.hints_left))
-            self.left_in_deck_label.update_text("Deck: " + str(len(self.deck) - (len(self.in_play_cards) + len(self.out_of_play_cards))))
+            self.left_in_deck_label.update_text("Deck: " + str(len(self.deck)))
 
             message_box = planes.Plane('message_box',
                                        pygame.Rect(LEFT_MARGIN,
@@ -299,58 +290,41 @@ class Game():
             #check which cards are clicked
             self.clicked_cards = []
             for card in self.in_play_cards:
-                self.actors.append(card)
-                if card.been_clicked:
+                sprite = self.sprite(card)
+                self.actors.append(sprite)
+                if sprite.been_clicked:
                     self.clicked_cards.append(card)
-                card.update()
+                sprite.update()
 
             #add click boxes
             for card in self.clicked_cards:
-                clicked_box = planes.Plane("box" + card.name,
-                                           pygame.Rect(card.rect.x-5,
-                                                       card.rect.y-5,
-                                                       card.rect.width + 10,
-                                                       card.rect.height + 10),
-                                           False, False)
-                clicked_box.image = pygame.image.load("img/clickbox.png")
+                rect = self.sprite(card).rect
+                clicked_box = self.click_box(card)
+                clicked_box.rect.topleft = (rect.x - 5, rect.y - 5)
                 self.actors.insert(0, clicked_box)
 
             #check for sets
             if len(self.clicked_cards) == 3:
-                is_set = check_set(self.clicked_cards[0],
-                                   self.clicked_cards[1],
-                                   self.clicked_cards[2])
-                if is_set:
-                    self.sets_found += 1
+                if self.core.submit(self.clicked_cards):
                     self.sets_found_label.update_text("Sets: " + str(self.sets_found))
-
-                    #remove cards and add new ones
-                    for card in self.clicked_cards:
-                        self.out_of_play_cards.append(card)
-                        index = self.in_play_cards.index(card)
-                        self.in_play_cards.remove(card)
-                        if len(self.in_play_cards) < 12:
-                            self.add_new_cards(1, index)
-                else:
-                    self.sets_wrong += 1
                 for card in self.clicked_cards:
-                    card.been_clicked = False
+                    self.sprite(card).been_clicked = False
 
 
             self.actors += self.gamelabels + self.gamebuttons
             if HINTS:
                 self.hints_left_label.update_text("Hints Remaining: " + str(self.hints_left))
-            self.left_in_deck_label.update_text("Deck: " + str(len(self.deck) - (len(self.in_play_cards) + len(self.out_of_play_cards))))
+            self.left_in_deck_label.update_text("Deck: " + str(len(self.deck)))
 
 class Model:
     """
     The Model is the overall object in controlling the entire program
     It instantiates Game objects as needed but also contains home screen
     """
-    def __init__(self):
+    def __init__(self, seed=None, recorder=None):
         self.background = (20, 20, 20)
 
-        self.game = Game(self)
+        self.game = Game(self, seed, recorder)
         self.actors = []
 
         ########################
@@ -375,7 +349,7 @@ class View:
     def draw(self):
         self.screen.remove_all()
         if isinstance(self.model.background, str):
-            self.screen.image = pygame.transform.scale(pygame.image.load(self.model.background),
+            self.screen.image = pygame.transform.scale(image(self.model.background),
                                                        (WINDOW_WIDTH, WINDOW_HEIGHT))
         else:
             self.screen.image.fill(self.model.background)
@@ -426,8 +400,9 @@ class View:
 
             # assign positions to cards in play
             for i in range(len(self.model.game.in_play_cards)):
-                self.model.game.in_play_cards[i].rect.x = positions[i][0]
-                self.model.game.in_play_cards[i].rect.y = positions[i][1]
+                sprite = self.model.game.sprite(self.model.game.in_play_cards[i])
+                sprite.rect.x = positions[i][0]
+                sprite.rect.y = positions[i][1]
 
         # add all actors to screen
         for actor in self.model.actors:
@@ -438,9 +413,14 @@ def main():
     pygame.init()
     size = (WINDOW_WIDTH, WINDOW_HEIGHT)
     main_screen = planes.Display(size)
+    convert_assets()
     main_screen.grab = False
+    main_screen.show_stats = SHOW_STATS
     main_screen.image.fill(BLACK)
-    main_model = Model()
+    recorder = None
+    if REPLAY_FILE is not None:
+        recorder = ReplayWriter(REPLAY_FILE)
+    main_model = Model(recorder=recorder)
     view = View(main_model, main_screen)
     running = True
 
@@ -448,6 +428,8 @@ def main():
         events = pygame.event.get()
         for event in events:
             if event.type == pygame.QUIT:
+                if recorder is not None:
+                    recorder.close()
                 raise SystemExit
 
         main_screen.process(events)
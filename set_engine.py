@@ -0,0 +1,135 @@
+# Python Set Game
+# Set rules for decks with any number of attributes, usable without pygame
+#
+# A deck with n attributes of 3 values each has 3^n cards, the points of AG(n, 3).
+# Each card is packed into an integer id whose base-3 digits are its attribute values.
+# Three cards form a Set when every digit sums to 0 mod 3, so any two cards have
+# exactly one third card completing them.
+
+CHUNK_DIGITS = 4
+CHUNK_SIZE = 3 ** CHUNK_DIGITS
+
+
+def _third_digits(id1, id2, num_digits):
+    """
+    Computes the third card of a Set digit by digit: each digit is (-a - b) mod 3
+    """
+    third = 0
+    place = 1
+    for _ in range(num_digits):
+        third += ((-(id1 % 3) - (id2 % 3)) % 3) * place
+        id1 //= 3
+        id2 //= 3
+        place *= 3
+    return third
+
+
+# CHUNK_TABLE[a][b] completes the lowest CHUNK_DIGITS digits of two cards at once
+CHUNK_TABLE = tuple(tuple(_third_digits(a, b, CHUNK_DIGITS) for b in range(CHUNK_SIZE))
+                    for a in range(CHUNK_SIZE))
+
+
+class SetEngine:
+    """
+    A SetEngine holds the rules of Set for a deck with num_attributes attributes
+    Completing a pair takes one CHUNK_TABLE lookup per 4 attributes, so decks of
+    up to 4 attributes need a single lookup and 8 attributes need two
+    """
+    def __init__(self, num_attributes):
+        if num_attributes < 1:
+            raise ValueError("a deck needs at least one attribute")
+        self.num_attributes = num_attributes
+        self.num_cards = 3 ** num_attributes
+        self.num_chunks = (num_attributes + CHUNK_DIGITS - 1) // CHUNK_DIGITS
+        # place value of each attribute digit in a card id, most significant first
+        self.places = tuple(3 ** (num_attributes - 1 - i) for i in range(num_attributes))
+
+    def encode(self, digits):
+        """
+        Packs attribute values into a card id
+        Args: digits - sequence of num_attributes values in 0..2, most significant first
+        Returns: the card id, an integer in 0..num_cards-1
+        """
+        card_id = 0
+        for digit in digits:
+            card_id = card_id*3 + digit
+        return card_id
+
+    def decode(self, card_id):
+        """
+        Unpacks a card id into its attribute values
+        Returns: tuple of num_attributes values in 0..2, most significant first
+        """
+        digits = []
+        for _ in range(self.num_attributes):
+            card_id, digit = divmod(card_id, 3)
+            digits.append(digit)
+        return tuple(reversed(digits))
+
+    def third(self, id1, id2):
+        """
+        Returns: the id of the only card that forms a Set with id1 and id2
+        """
+        if self.num_chunks == 1:
+            return CHUNK_TABLE[id1][id2]
+        third = 0
+        place = 1
+        for _ in range(self.num_chunks):
+            id1, chunk1 = divmod(id1, CHUNK_SIZE)
+            id2, chunk2 = divmod(id2, CHUNK_SIZE)
+            third += CHUNK_TABLE[chunk1][chunk2] * place
+            place *= CHUNK_SIZE
+        return third
+
+    def is_set(self, id1, id2, id3):
+        """
+        Given three card ids, checks whether the cards form a Set
+        """
+        return self.third(id1, id2) == id3
+
+    def iter_sets(self, card_ids):
+        """
+        Yields every Set among the given cards exactly once
+        Each pair looks up its third card in a membership table of the cards, so runs in
+        O(m^2) for m cards, whatever the number of attributes
+        Args: card_ids - list of distinct card ids
+        Returns: generator of tuples of three card ids, in the order given
+        """
+        positions = dict((card_id, i) for i, card_id in enumerate(card_ids))
+        for i in range(len(card_ids) - 2):
+            id1 = card_ids[i]
+            for j in range(i + 1, len(card_ids) - 1):
+                k = positions.get(self.third(id1, card_ids[j]))
+                if k is not None and k > j:
+                    yield (id1, card_ids[j], card_ids[k])
+
+    def find_set(self, card_ids):
+        """
+        Returns: one Set among the given cards as a tuple of three ids, or None if there is none
+        """
+        for found in self.iter_sets(card_ids):
+            return found
+        return None
+
+    def count_sets(self, card_ids):
+        """
+        Returns the number of Sets among the given cards
+        """
+        return sum(1 for _ in self.iter_sets(card_ids))
+
+    def is_set_free(self, card_ids):
+        """
+        Checks whether no three of the given cards form a Set (a cap, in AG(n, 3) terms)
+        """
+        return self.find_set(card_ids) is None
+
+    def all_sets(self):
+        """
+        Yields every Set of the full deck once, as a tuple of three ids in increasing order
+        There are num_cards * (num_cards - 1) / 6 of them
+        """
+        for id1 in range(self.num_cards):
+            for id2 in range(id1 + 1, self.num_cards):
+                id3 = self.third(id1, id2)
+                if id3 > id2:
+                    yield (id1, id2, id3)
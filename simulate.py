@@ -0,0 +1,160 @@
+# Python Set Game
+# Monte Carlo statistics from many complete games, played across a process pool
+#
+# Usage: python simulate.py GAMES [--seed SEED] [--workers N] [--chunk N]
+
+import argparse
+import collections
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from deck import spawn_rngs
+from game_core import BOARD_SIZE, GameCore
+
+
+def first_set_player(core):
+    """
+    The default scripted player: plays the first Set it finds
+    A player is any picklable function taking a GameCore and returning a Set on its
+    board as a tuple of three cards, or None when it cannot find one
+    """
+    return core.find_set()
+
+
+class Histograms:
+    """
+    Histograms collects the statistics of many simulated games
+    plus3 and leftover map a count per game (+3 deals, cards left at the end) to the
+    number of games with that count; boards_at_12 and no_set_at_12 count how many
+    12-card boards the player looked at and how many of them had no Set, and
+    set_counts maps a number of Sets to how many of those boards had that many
+    """
+    def __init__(self):
+        self.games = 0
+        self.plus3 = collections.Counter()
+        self.leftover = collections.Counter()
+        self.boards_at_12 = 0
+        self.no_set_at_12 = 0
+        self.set_counts = collections.Counter()
+
+    def merge(self, other):
+        self.games += other.games
+        self.plus3.update(other.plus3)
+        self.leftover.update(other.leftover)
+        self.boards_at_12 += other.boards_at_12
+        self.no_set_at_12 += other.no_set_at_12
+        self.set_counts.update(other.set_counts)
+
+    def play(self, seed, player=first_set_player):
+        """
+        Plays one complete game and records it
+        The game does not deal extra cards on its own, so every +3 is the player's
+        """
+        core = GameCore(seed, auto_add3=False)
+        plus3 = 0
+        while True:
+            found = player(core)
+            if len(core.board) == BOARD_SIZE:
+                self.boards_at_12 += 1
+                self.set_counts[core.count_sets()] += 1
+                if found is None:
+                    self.no_set_at_12 += 1
+            if found is not None:
+                core.submit(list(found))
+            elif len(core.deck) > 0:
+                core.add_new_cards(3)
+                plus3 += 1
+            else:
+                break
+        self.games += 1
+        self.plus3[plus3] += 1
+        self.leftover[len(core.board)] += 1
+
+    def mean_plus3(self):
+        if self.games == 0:
+            return 0.0
+        return float(sum(count*games for count, games in self.plus3.items())) / self.games
+
+    def no_set_rate(self):
+        if self.boards_at_12 == 0:
+            return 0.0
+        return float(self.no_set_at_12) / self.boards_at_12
+
+    def report(self):
+        """
+        Returns: the statistics as a human-readable multi-line string
+        """
+        lines = ["games: " + str(self.games),
+                 "12-card boards with no Set: " + str(self.no_set_at_12) + " of " +
+                 str(self.boards_at_12) + " (" + "%.4f" % self.no_set_rate() + ")",
+                 "mean +3 deals per game: " + "%.4f" % self.mean_plus3(),
+                 "+3 deals per game:"]
+        for count in sorted(self.plus3):
+            lines.append("  " + str(count) + ": " + str(self.plus3[count]))
+        lines.append("cards left at the end:")
+        for count in sorted(self.leftover):
+            lines.append("  " + str(count) + ": " + str(self.leftover[count]))
+        lines.append("Sets on 12-card boards:")
+        for count in sorted(self.set_counts):
+            lines.append("  " + str(count) + ": " + str(self.set_counts[count]))
+        return "\n".join(lines)
+
+
+def play_chunk(rng, num_games, player=first_set_player):
+    """
+    Plays num_games games in one worker
+    Each game gets its own int seed drawn from the numpy Generator rng, so any single
+    game can be replayed with GameCore(seed)
+    Returns: Histograms of the games played
+    """
+    histograms = Histograms()
+    for _ in range(num_games):
+        histograms.play(int(rng.integers(2**63)), player)
+    return histograms
+
+
+def iter_simulate(num_games, seed=None, workers=None, chunk_size=1000, player=first_set_player):
+    """
+    Plays num_games games across a pool of worker processes
+    Games are handed out in chunks of chunk_size, each with its own generator from
+    deck.spawn_rngs(seed), so the results only depend on seed and chunk_size
+    Args: workers - number of processes, None for one per CPU
+    Returns: generator of Histograms, one per chunk, in the order they finish
+    """
+    chunks = [chunk_size] * (num_games // chunk_size)
+    if num_games % chunk_size:
+        chunks.append(num_games % chunk_size)
+    rngs = spawn_rngs(seed, len(chunks))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(play_chunk, rng, games, player)
+                   for rng, games in zip(rngs, chunks)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def simulate(num_games, seed=None, workers=None, chunk_size=1000, player=first_set_player):
+    """
+    Plays num_games games across a pool of worker processes, see iter_simulate
+    Returns: Histograms of all the games
+    """
+    total = Histograms()
+    for histograms in iter_simulate(num_games, seed, workers, chunk_size, player):
+        total.merge(histograms)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many games of Set")
+    parser.add_argument("games", type=int, help="number of games to play")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="default: one per CPU")
+    parser.add_argument("--chunk", type=int, default=1000, help="games per task")
+    args = parser.parse_args()
+
+    total = Histograms()
+    for histograms in iter_simulate(args.games, args.seed, args.workers, args.chunk):
+        total.merge(histograms)
+        print("played " + str(total.games) + " of " + str(args.games))
+    print(total.report())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# Python Set Game
+# Records games through the pygame Game and replays them without pygame
+#
+# Usage: python -m unittest test_replay
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from card_utils import THIRD_CARD
+from replay import replay_game
+from replay_log import ReplayWriter, read_games
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def split_pair(game):
+    """
+    Returns: two cards on the board, last in board order first, whose third card is
+             not on the board, or None if every pair is completed on the board
+    """
+    cards = game.in_play_cards
+    for i in range(len(cards)):
+        for j in range(i + 1, len(cards)):
+            if THIRD_CARD[cards[i].card_id][cards[j].card_id] not in game.core.board.by_id:
+                return cards[j], cards[i]
+    return None
+
+
+def play(model, rng):
+    """
+    Plays a game on model's Game the way a player would, through clicks on the sprites
+    Hints are often asked for with two cards selected that do not lead to a Set,
+    clicked out of board order
+    """
+    game = model.game
+    while not game.core.check_if_won():
+        chance = rng.random()
+        if chance < 0.3 and game.hints_left > 0:
+            for card in game.selected_cards():
+                game.sprite(card).clicked("left")
+            pair = split_pair(game)
+            if pair is not None:
+                for card in pair:
+                    game.sprite(card).clicked("left")
+            game.use_hint()
+            model.update()
+            continue
+        if chance < 0.4:
+            for card in game.selected_cards():
+                game.sprite(card).clicked("left")
+            for card in rng.sample(game.in_play_cards, 3):
+                game.sprite(card).clicked("left")
+            model.update()
+            continue
+        found = game.core.find_set()
+        if found is None:
+            game.core.add_three()
+            continue
+        for card in game.selected_cards():
+            if card not in found:
+                game.sprite(card).clicked("left")
+        for card in found:
+            if not game.sprite(card).been_clicked:
+                game.sprite(card).clicked("left")
+        model.update()
+
+
+class RecordedGameTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cwd = os.getcwd()
+        os.chdir(HERE)  # the game loads its images from img/
+        pygame.init()
+        import set as set_game
+        cls.set_game = set_game
+        cls.tmp = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls.cwd)
+        shutil.rmtree(cls.tmp)
+
+    def record(self, name, num_games):
+        """
+        Plays num_games games on screen into a replay file
+        Returns: the games read back from the file
+        """
+        path = os.path.join(self.tmp, name)
+        recorder = ReplayWriter(path)
+        rng = random.Random(0)
+        for seed in range(num_games):
+            play(self.set_game.Model(seed, recorder), rng)
+        recorder.close()
+        games = read_games(path)
+        self.assertEqual(len(games), num_games)
+        return games
+
+    def check_replays(self, games, view):
+        for game in games:
+            result = replay_game(game, view)
+            self.assertEqual(result.divergences, [], "seed " + str(result.seed))
+            self.assertTrue(result.ok(), "seed " + str(result.seed))
+
+    def test_games_played_on_screen_replay_headless(self):
+        self.check_replays(self.record("headless.bin", 12), False)
+
+    def test_games_played_on_screen_replay_with_the_view(self):
+        self.check_replays(self.record("view.bin", 3), True)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+# Python Set Game
+# Checks the rules engine against brute force, without pygame
+#
+# Usage: python -m unittest test_rules
+
+import itertools
+import random
+import unittest
+
+import numpy as np
+
+from batch_check import check_sets
+from batch_simulate import MAX_BOARD, BatchSimulation, batch_simulate
+from bitboard import BitBoard
+from board import Board
+from card_utils import CARDS, ENGINE, NUM_CARDS, check_set
+from deck import Deck, make_rng, spawn_rngs
+from endgame import Lookahead
+from game_core import GameCore
+from set_engine import SetEngine
+
+# the attribute values of each card, as digits
+DIGITS = [ENGINE.decode(card_id) for card_id in range(NUM_CARDS)]
+
+
+def digits_set(digits1, digits2, digits3):
+    """
+    Brute force Set check: every attribute is all the same or all different
+    """
+    return all(len(set(values)) != 2 for values in zip(digits1, digits2, digits3))
+
+
+def brute_force_sets(cards):
+    """
+    Returns: the set of every Set among cards, each as a sorted tuple of card ids
+    """
+    return set(tuple(sorted(card.card_id for card in triple))
+               for triple in itertools.combinations(cards, 3)
+               if digits_set(*(DIGITS[card.card_id] for card in triple)))
+
+
+def set_ids(found):
+    return set(tuple(sorted(card.card_id for card in triple)) for triple in found)
+
+
+class SetEngineTest(unittest.TestCase):
+
+    def test_encode_and_decode_are_inverses(self):
+        for num_attributes in range(1, 7):
+            engine = SetEngine(num_attributes)
+            for card_id in range(engine.num_cards):
+                digits = engine.decode(card_id)
+                self.assertEqual(len(digits), num_attributes)
+                self.assertEqual(engine.encode(digits), card_id)
+
+    def test_third_matches_brute_force(self):
+        for num_attributes in (1, 2, 3, 5):
+            engine = SetEngine(num_attributes)
+            decoded = [engine.decode(card_id) for card_id in range(engine.num_cards)]
+            for id1, id2 in itertools.product(range(engine.num_cards), repeat=2):
+                id3 = engine.third(id1, id2)
+                self.assertTrue(digits_set(decoded[id1], decoded[id2], decoded[id3]))
+
+    def test_all_sets_counts_every_set_once(self):
+        for num_attributes in (1, 2, 3, 5):
+            engine = SetEngine(num_attributes)
+            sets = list(engine.all_sets())
+            self.assertEqual(len(sets), engine.num_cards * (engine.num_cards - 1) // 6)
+            self.assertEqual(len(set(sets)), len(sets))
+
+    def test_iter_sets_matches_brute_force(self):
+        rng = random.Random(5)
+        for num_attributes in (2, 3, 5, 8):
+            engine = SetEngine(num_attributes)
+            for _ in range(20):
+                card_ids = rng.sample(range(engine.num_cards), min(15, engine.num_cards))
+                expected = set(triple for triple in itertools.combinations(card_ids, 3)
+                               if digits_set(*(engine.decode(card_id) for card_id in triple)))
+                self.assertEqual(set(engine.iter_sets(card_ids)), expected)
+                self.assertEqual(engine.count_sets(card_ids), len(expected))
+                self.assertEqual(engine.is_set_free(card_ids), not expected)
+
+
+class BatchCheckTest(unittest.TestCase):
+
+    def test_check_sets_matches_check_set_on_every_triple(self):
+        triples = np.array(list(itertools.product(range(NUM_CARDS), repeat=3)))
+        found = check_sets(triples)
+        expected = [check_set(CARDS[id1], CARDS[id2], CARDS[id3]) for id1, id2, id3 in triples]
+        self.assertEqual(found.tolist(), expected)
+
+
+class BoardTest(unittest.TestCase):
+
+    def check_index(self, board):
+        expected = brute_force_sets(board.cards)
+        self.assertEqual(set_ids(board.iter_sets()), expected)
+        self.assertEqual(board.count_sets(), len(expected))
+        self.assertEqual(board.has_set(), bool(expected))
+        found = board.find_set()
+        if expected:
+            self.assertIn(tuple(sorted(card.card_id for card in found)), expected)
+        else:
+            self.assertIsNone(found)
+        for i, card in enumerate(board.cards):
+            self.assertEqual(board.position(card), i)
+
+    def check_inserts_and_removes(self, board):
+        rng = random.Random(3)
+        pile = list(CARDS)
+        rng.shuffle(pile)
+        for _ in range(400):
+            if len(board) < 9 or (len(board) < 21 and rng.random() < 0.5):
+                board.insert(rng.randint(0, len(board)), pile.pop())
+            else:
+                card = rng.choice(board.cards)
+                board.remove(card)
+                pile.insert(rng.randint(0, len(pile)), card)
+            self.check_index(board)
+
+    def test_board_index_matches_brute_force(self):
+        self.check_inserts_and_removes(Board())
+
+    def test_bitboard_matches_brute_force(self):
+        self.check_inserts_and_removes(BitBoard())
+
+
+class DeckTest(unittest.TestCase):
+
+    def deal_order(self, seed):
+        return [card.card_id for card in Deck(rng=seed).draw(NUM_CARDS)]
+
+    def test_same_seed_same_deal(self):
+        self.assertEqual(self.deal_order(7), self.deal_order(7))
+        self.assertNotEqual(self.deal_order(7), self.deal_order(8))
+
+    def test_numpy_seed_deals_like_an_int(self):
+        self.assertEqual(self.deal_order(np.int64(7)), self.deal_order(7))
+        self.assertEqual(make_rng(np.int64(7)).random(), make_rng(7).random())
+
+    def test_peek_shows_the_next_draw(self):
+        deck = Deck(rng=1)
+        while len(deck):
+            peeked = deck.peek(5)
+            self.assertEqual(deck.draw(5), peeked)
+
+    def test_same_seed_same_game(self):
+        for seed in range(5):
+            first = GameCore(seed)
+            second = GameCore(np.int64(seed), bitboard=True)
+            self.assertEqual([card.card_id for card in first.in_play_cards],
+                             [card.card_id for card in second.in_play_cards])
+
+    def test_spawned_generators_are_independent(self):
+        rngs = spawn_rngs(11, 4)
+        draws = [tuple(rng.permutation(NUM_CARDS)) for rng in rngs]
+        self.assertEqual(len(set(draws)), len(draws))
+        again = [tuple(rng.permutation(NUM_CARDS)) for rng in spawn_rngs(11, 4)]
+        self.assertEqual(draws, again)
+
+
+class BatchSimulationTest(unittest.TestCase):
+
+    def test_games_play_to_the_end(self):
+        simulation = BatchSimulation(500, np.random.default_rng(2))
+        histograms = simulation.run()
+        self.assertEqual(histograms.games, 500)
+        self.assertTrue(simulation.done.all())
+        self.assertEqual((simulation.next_card == NUM_CARDS).sum(), 500)
+        self.assertEqual(sum(histograms.plus3.values()), 500)
+        self.assertEqual(sum(histograms.leftover.values()), 500)
+        self.assertTrue(all(0 <= left <= 20 and left % 3 == 0 for left in histograms.leftover))
+        self.assertLessEqual(histograms.no_set_at_12, histograms.boards_at_12)
+        self.assertEqual(sum(histograms.set_counts.values()), histograms.boards_at_12)
+
+    def test_final_boards_have_no_set(self):
+        simulation = BatchSimulation(100, np.random.default_rng(4))
+        simulation.run()
+        for g in range(100):
+            cards = [CARDS[card_id] for card_id in simulation.board[g] if card_id < NUM_CARDS]
+            self.assertEqual(len(cards), simulation.leftover[g])
+            self.assertLessEqual(len(cards), MAX_BOARD)
+            self.assertEqual(brute_force_sets(cards), set())
+
+    def test_batches_add_up(self):
+        histograms = batch_simulate(250, seed=6, batch_size=100)
+        self.assertEqual(histograms.games, 250)
+        self.assertEqual(sum(histograms.leftover.values()), 250)
+
+
+class LookaheadTest(unittest.TestCase):
+
+    def test_best_sets_reach_the_predicted_end(self):
+        for seed in range(6):
+            core = GameCore(seed)
+            while len(core.deck) > 15:
+                core.submit(list(core.find_set()))
+            lookahead = Lookahead(core)
+            predicted = lookahead.stranded()
+            perfect_sets = lookahead.perfect_sets()
+            while True:
+                found = lookahead.best_set()
+                if found is None:
+                    break
+                self.assertTrue(core.submit(list(found)))
+                self.assertEqual(lookahead.stranded(), predicted)
+            self.assertTrue(core.check_if_won())
+            self.assertEqual(len(core.in_play_cards), predicted)
+            self.assertEqual(core.sets_found, perfect_sets)
+
+if __name__ == "__main__":
+    unittest.main()